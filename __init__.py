@@ -11,12 +11,15 @@ bl_info = {
 }
 
 from . import main
+from . import watch
 
 def register():
     main.register()
+    watch.register()
 
 
 def unregister():
+    watch.unregister()
     main.unregister()
 
 
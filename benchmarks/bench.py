@@ -0,0 +1,299 @@
+"""Stage-by-stage benchmark of the parse/hash/build/export pipeline and the
+selection handler.
+
+Without Blender (uses the stand-in from standin.py):
+
+    python benchmarks/bench.py --sizes 1000 10000 100000
+
+Inside Blender, against real RNA:
+
+    blender --background --python benchmarks/bench.py -- --sizes 1000 10000
+
+Peak memory comes from tracemalloc, so it covers Python and NumPy
+allocations but not memory Blender allocates for the curve itself.
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ADDON_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import standin  # noqa: E402
+import synthetic  # noqa: E402
+
+USING_STANDIN = standin.install()
+
+import bpy  # noqa: E402
+import numpy as np  # noqa: E402
+
+
+def load_addon():
+    spec = importlib.util.spec_from_file_location("train_tools_bench", os.path.join(ADDON_DIR, "__init__.py"),
+                                                  submodule_search_locations=[ADDON_DIR])
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = addon
+    spec.loader.exec_module(addon)
+    return addon
+
+
+addon = load_addon()
+main = addon.main
+core = sys.modules["train_tools_bench.track_core"]
+
+
+def stage_parse_line(path):
+    with open(path, 'r') as file:
+        next(file)
+        return [core.parse_line(line.strip()) for line in file]
+
+
+def stage_parse_columnar(path):
+    with open(path, 'r') as file:
+        return core.parse_track_file(file)[1]
+
+
+def stage_hash_scalar(arrays):
+    hashes = []
+    for x, y, z in arrays.position.tolist():
+        data = {0: int(x * 100.0) & 0xFFFFFFFF, 1: int(y * 100.0) & 0xFFFFFFFF, 2: int(z * 100.0) & 0xFFFFFFFF}
+        hashes.append(core.compute_probe_hash(data, 0))
+    return hashes
+
+
+def stage_hash_batched(arrays):
+    return core.compute_probe_hashes(core.quantize_positions(arrays.position))
+
+
+def new_spline(count):
+    curve = bpy.data.curves.new('BezierCurve', type='CURVE')
+    curve.dimensions = '3D'
+    spline = curve.splines.new('BEZIER')
+    spline.bezier_points.add(count - 1)
+    return curve, spline
+
+
+def stage_build_per_point(arrays):
+    curve, spline = new_spline(arrays.count)
+    main.build_spline_per_point(spline, arrays)
+    return curve
+
+
+def stage_build_bulk(arrays):
+    curve, spline = new_spline(arrays.count)
+    main.build_spline_bulk(spline, arrays)
+    return curve
+
+
+def stage_export_per_point(spline, node_index, out_path):
+    bezier_points = spline.bezier_points
+    count = len(bezier_points)
+    lines = []
+    for i in range(count):
+        point = bezier_points[i]
+        data = {0: int(point.co[0] * 100.0) & 0xFFFFFFFF, 1: int(point.co[1] * 100.0) & 0xFFFFFFFF, 2: int(point.co[2] * 100.0) & 0xFFFFFFFF}
+        node_name = node_index.get(core.compute_probe_hash(data, 0), "")
+        next_point = bezier_points[i + 1] if i < count - 1 else bezier_points[0]
+        lines.append(core.export_to_text(point, core.distance(point.co, next_point.co), node_name))
+    with open(out_path, 'w') as file:
+        for line in lines:
+            file.write(f"{line}\n")
+
+
+def stage_export_vectorized(spline, node_index, out_path):
+    co, handle_left, handle_right, radius = main.read_spline_arrays(spline)
+    node_names, _ = core.resolve_node_names(co, radius, node_index)
+    lines = core.format_track_lines(co, handle_left, handle_right, radius, node_names)
+    with open(out_path, 'w') as file:
+        file.write("\n".join(lines) + "\n")
+
+
+# Depsgraph updates per handler stage, the table shows the cost of one
+HANDLER_UPDATES = 200
+
+
+def legacy_update_custom_properties(scene, obj):
+    # update_custom_properties before the selection cache, for comparison
+    for spline in obj.data.splines:
+        for point in spline.bezier_points:
+            if point.select_control_point:
+                point_index = spline.bezier_points[:].index(point)
+                if scene.curve_point_index == point_index:
+                    return
+                scene.curve_point_index = point_index
+                return
+
+
+def handler_scene(curve):
+    # Scene and active object the handler reads, with one point selected
+    # half way along the curve
+    bezier_points = curve.splines[0].bezier_points
+    selected = np.zeros(len(bezier_points), dtype=bool)
+    selected[len(selected) // 2] = True
+    bezier_points.foreach_set("select_control_point", selected)
+    if USING_STANDIN:
+        obj = types.SimpleNamespace(type='CURVE', name="Track", data=curve)
+        bpy.context = types.SimpleNamespace(active_object=obj)
+        scene = types.SimpleNamespace(name="Scene", tracks=[], curve_point_index=-1)
+        return scene, obj
+    obj = bpy.data.objects.new("Track", curve)
+    bpy.context.scene.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    return bpy.context.scene, obj
+
+
+def release_handler_scene(obj):
+    if USING_STANDIN:
+        bpy.context = None
+    else:
+        bpy.data.objects.remove(obj)
+
+
+def stage_handler_legacy(scene, obj, updates):
+    for _ in range(updates):
+        legacy_update_custom_properties(scene, obj)
+
+
+def stage_handler(scene, depsgraph, updates):
+    for _ in range(updates):
+        main.update_custom_properties(scene, depsgraph)
+
+
+def measure(stage, points, func, *args, trace_memory=True):
+    gc.collect()
+    start = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - start
+
+    peak_mib = None
+    if trace_memory:
+        # Separate traced run, tracemalloc itself slows Python-heavy stages down
+        release(result)
+        result = None
+        gc.collect()
+        tracemalloc.start()
+        result = func(*args)
+        peak_mib = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    return result, {
+        "stage": stage,
+        "points": points,
+        "seconds": seconds,
+        "points_per_second": points / seconds if seconds > 0 else float("inf"),
+        "peak_mib": peak_mib,
+    }
+
+
+def release(result):
+    if USING_STANDIN or result is None:
+        return
+    if isinstance(result, bpy.types.Curve):
+        bpy.data.curves.remove(result)
+
+
+def run_size(points, work_dir, legacy=True, trace_memory=True, seed=0):
+    path = synthetic.write_track(os.path.join(work_dir, f"track_{points}.dat"), points, seed)
+    results = []
+
+    def run(stage, func, *args):
+        result, row = measure(stage, points, func, *args, trace_memory=trace_memory)
+        results.append(row)
+        return result
+
+    def run_per_update(stage, func, *args):
+        result, row = measure(stage, points, func, *args, trace_memory=trace_memory)
+        row["seconds"] /= HANDLER_UPDATES
+        row["points_per_second"] = points / row["seconds"] if row["seconds"] > 0 else float("inf")
+        results.append(row)
+        return result
+
+    if legacy:
+        run("parse_line", stage_parse_line, path)
+    arrays = run("parse_columnar", stage_parse_columnar, path)
+
+    if legacy:
+        run("hash_scalar", stage_hash_scalar, arrays)
+    run("hash_batched", stage_hash_batched, arrays)
+
+    if legacy:
+        release(run("build_per_point", stage_build_per_point, arrays))
+    curve = run("build_bulk", stage_build_bulk, arrays)
+    spline = curve.splines[0]
+
+    node_rows = arrays.node_rows()
+    node_ids = core.compute_probe_hashes(core.quantize_positions(arrays.position[node_rows])).tolist()
+    node_index = {str(node_id): arrays.station_names[row] for row, node_id in zip(node_rows, node_ids)}
+
+    out_path = os.path.join(work_dir, f"export_{points}.dat")
+    if legacy:
+        run("export_per_point", stage_export_per_point, spline, node_index, out_path)
+    run("export_vectorized", stage_export_vectorized, spline, node_index, out_path)
+
+    # Idle updates name nothing, edit updates name the curve, as a
+    # transform or selection change in edit mode does
+    scene, obj = handler_scene(curve)
+    idle = types.SimpleNamespace(updates=[])
+    edit = types.SimpleNamespace(updates=[types.SimpleNamespace(id=types.SimpleNamespace(original=curve))])
+    if legacy:
+        run_per_update("handler_legacy", stage_handler_legacy, scene, obj, HANDLER_UPDATES)
+    run_per_update("handler_idle", stage_handler, scene, idle, HANDLER_UPDATES)
+    run_per_update("handler_edit", stage_handler, scene, edit, HANDLER_UPDATES)
+    release_handler_scene(obj)
+
+    release(curve)
+    return results
+
+
+def print_table(results):
+    print(f"{'stage':<20} {'points':>9} {'seconds':>10} {'points/s':>14} {'peak MiB':>10}")
+    for row in results:
+        peak = "-" if row["peak_mib"] is None else f"{row['peak_mib']:.1f}"
+        print(f"{row['stage']:<20} {row['points']:>9} {row['seconds']:>10.6f} {row['points_per_second']:>14,.0f} {peak:>10}")
+
+
+def main_cli(argv=None):
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description="Benchmark the TRAIN TOOLS parse/hash/build/export stages")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-legacy", action="store_true", help="Skip the per-point/per-line reference stages")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak memory runs")
+    parser.add_argument("--json", help="Append results to this JSON file")
+    args = parser.parse_args(argv)
+
+    print(f"backend: {'stand-in' if USING_STANDIN else 'blender ' + bpy.app.version_string}, numpy {np.__version__}")
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for points in args.sizes:
+            rows = run_size(points, work_dir, legacy=not args.skip_legacy, trace_memory=not args.no_memory, seed=args.seed)
+            print_table(rows)
+            print()
+            results.extend(rows)
+
+    if args.json:
+        history = []
+        if os.path.exists(args.json):
+            with open(args.json, 'r') as file:
+                history = json.load(file)
+        history.append({
+            "timestamp": time.time(),
+            "backend": "standin" if USING_STANDIN else "blender",
+            "results": results,
+        })
+        with open(args.json, 'w') as file:
+            json.dump(history, file, indent=2)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,200 @@
+"""Minimal bpy/mathutils stand-in so the addon's hot paths can be timed
+without Blender.
+
+Curves are backed by NumPy arrays and support the parts of the RNA API the
+addon uses (bezier_points.add, foreach_get/foreach_set, per-point attribute
+access). Only Python-side cost is representative; RNA overhead is not.
+"""
+import sys
+import types
+
+import numpy as np
+
+
+def vector_property(name):
+    def getter(self):
+        return tuple(getattr(self._points, name)[self._index].tolist())
+
+    def setter(self, value):
+        getattr(self._points, name)[self._index] = tuple(value)
+
+    return property(getter, setter)
+
+
+class StandinBezierPoint:
+    def __init__(self, points, index):
+        self._points = points
+        self._index = index
+
+    co = vector_property("co_array")
+    handle_left = vector_property("handle_left_array")
+    handle_right = vector_property("handle_right_array")
+
+    @property
+    def radius(self):
+        return float(self._points.radius_array[self._index])
+
+    @radius.setter
+    def radius(self, value):
+        self._points.radius_array[self._index] = value
+
+    @property
+    def select_control_point(self):
+        return bool(self._points.select_array[self._index])
+
+    @select_control_point.setter
+    def select_control_point(self, value):
+        self._points.select_array[self._index] = value
+
+    handle_left_type = 'FREE'
+    handle_right_type = 'FREE'
+
+    def __eq__(self, other):
+        # RNA structs compare by the data they point at
+        return isinstance(other, StandinBezierPoint) and other._points is self._points and other._index == self._index
+
+
+class StandinBezierPoints:
+    def __init__(self):
+        self.co_array = np.zeros((1, 3), dtype=np.float32)
+        self.handle_left_array = np.zeros((1, 3), dtype=np.float32)
+        self.handle_right_array = np.zeros((1, 3), dtype=np.float32)
+        self.radius_array = np.ones(1, dtype=np.float32)
+        self.select_array = np.zeros(1, dtype=bool)
+
+    def __len__(self):
+        return len(self.radius_array)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [StandinBezierPoint(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("bpy_prop_collection[index]: index out of range")
+        return StandinBezierPoint(self, index)
+
+    def __iter__(self):
+        return (StandinBezierPoint(self, i) for i in range(len(self)))
+
+    def add(self, count=1):
+        for name, fill in (("co_array", 0.0), ("handle_left_array", 0.0), ("handle_right_array", 0.0), ("radius_array", 1.0), ("select_array", False)):
+            old = getattr(self, name)
+            extra = np.full((count,) + old.shape[1:], fill, dtype=old.dtype)
+            setattr(self, name, np.concatenate([old, extra]))
+
+    def _array(self, attr):
+        return {"co": self.co_array, "handle_left": self.handle_left_array, "handle_right": self.handle_right_array,
+                "radius": self.radius_array, "select_control_point": self.select_array}[attr]
+
+    def foreach_get(self, attr, seq):
+        array = self._array(attr)
+        if seq.size != array.size:
+            raise RuntimeError("internal error setting the array")
+        seq[:] = array.reshape(-1)
+
+    def foreach_set(self, attr, seq):
+        array = self._array(attr)
+        if len(seq) != array.size:
+            raise RuntimeError("internal error setting the array")
+        array.reshape(-1)[:] = seq
+
+
+class StandinSpline:
+    def __init__(self, curve):
+        self.id_data = curve
+        self.bezier_points = StandinBezierPoints()
+
+    def as_pointer(self):
+        return id(self)
+
+
+class StandinSplines(list):
+    def __init__(self, curve):
+        super().__init__()
+        self._curve = curve
+        self.active = None
+
+    def new(self, type):
+        spline = StandinSpline(self._curve)
+        self.append(spline)
+        self.active = spline
+        return spline
+
+
+class StandinCurve:
+    def __init__(self, name):
+        self.name = name
+        self.users = 0
+        self.splines = StandinSplines(self)
+
+    def update_tag(self):
+        pass
+
+
+class StandinCurves(dict):
+    def new(self, name, type):
+        curve = StandinCurve(name)
+        self[id(curve)] = curve
+        return curve
+
+    def remove(self, curve):
+        self.pop(id(curve), None)
+
+
+def install():
+    """Register the stand-in modules in sys.modules. Returns False if the real bpy is importable."""
+    try:
+        import bpy  # noqa: F401
+        return False
+    except ImportError:
+        pass
+
+    class Base:
+        pass
+
+    def prop(*args, **kwargs):
+        return None
+
+    bpy = types.ModuleType("bpy")
+    bpy.props = types.SimpleNamespace(
+        StringProperty=prop, IntProperty=prop, FloatProperty=prop, BoolProperty=prop,
+        EnumProperty=prop, CollectionProperty=prop, PointerProperty=prop, FloatVectorProperty=prop,
+    )
+    bpy.types = types.SimpleNamespace(
+        Panel=Base, UIList=Base, Operator=Base, PropertyGroup=Base, Object=Base,
+        UILayout=Base, Scene=Base, bpy_prop_collection=Base, OperatorFileListElement=Base,
+    )
+    handlers = types.ModuleType("bpy.app.handlers")
+    handlers.persistent = lambda func: func
+    handlers.depsgraph_update_post = []
+    handlers.load_post = []
+    app = types.ModuleType("bpy.app")
+    app.handlers = handlers
+    app.timers = types.SimpleNamespace(register=prop, unregister=prop, is_registered=lambda func: False)
+    bpy.app = app
+    bpy.data = types.SimpleNamespace(curves=StandinCurves(), objects={})
+    bpy.context = None
+    bpy.utils = types.SimpleNamespace(register_class=prop, unregister_class=prop)
+
+    io_utils = types.ModuleType("bpy_extras.io_utils")
+    io_utils.ImportHelper = type("ImportHelper", (), {})
+    io_utils.ExportHelper = type("ExportHelper", (), {})
+    bpy_extras = types.ModuleType("bpy_extras")
+    bpy_extras.io_utils = io_utils
+
+    mathutils = types.ModuleType("mathutils")
+    mathutils.Vector = lambda values: tuple(float(np.float32(value)) for value in values)
+
+    sys.modules.update({
+        "bpy": bpy,
+        "bpy.app": app,
+        "bpy.app.handlers": handlers,
+        "bpy_extras": bpy_extras,
+        "bpy_extras.io_utils": io_utils,
+        "mathutils": mathutils,
+    })
+    return True
@@ -0,0 +1,76 @@
+"""Synthetic .dat track generator.
+
+    python benchmarks/synthetic.py out.dat --points 100000 --seed 1
+"""
+import argparse
+import math
+import random
+
+
+NODE_TOKENS = ("1", "2", "6", "8")
+
+
+def generate_lines(points, seed=0, curve_ratio=0.3, node_spacing=400, tunnel_ratio=0.05):
+    rng = random.Random(seed)
+    x = y = z = 0.0
+    heading = 0.0
+    tunnel_left = 0
+    rows = []
+    for i in range(points):
+        heading += rng.gauss(0.0, 0.02)
+        step = rng.uniform(2.0, 8.0)
+        x += math.cos(heading) * step
+        y += math.sin(heading) * step
+        z += rng.gauss(0.0, 0.05)
+
+        # Stations/junctions are sparse, tunnels come in contiguous runs
+        flag = "0"
+        name = ""
+        if i % node_spacing == node_spacing // 2:
+            flag = rng.choice(NODE_TOKENS)
+            name = f"{'junction' if flag == '8' else 'station'}_{i}"
+        elif tunnel_left:
+            flag = "4"
+            tunnel_left -= 1
+        elif rng.random() < tunnel_ratio / 50.0:
+            tunnel_left = 50
+        elif rng.random() < 0.001:
+            flag = "32"
+
+        if rng.random() < curve_ratio:
+            dx = math.cos(heading) * step / 3.0
+            dy = math.sin(heading) * step / 3.0
+            rows.append((True, (x, y, z), (x - dx, y - dy, z), (x + dx, y + dy, z), flag, name))
+        else:
+            rows.append((False, (x, y, z), None, None, flag, name))
+
+    lines = []
+    for i, (is_curve, position, handle_a, handle_b, flag, name) in enumerate(rows):
+        next_position = rows[(i + 1) % points][1]
+        dist = math.sqrt(sum((a - b) * (a - b) for a, b in zip(position, next_position)))
+        if is_curve:
+            lines.append("c %.4f %.4f %.4f %.4f %.4f %.4f %.4f %.4f %.4f %.4f %s %s" % (*position, *handle_a, *handle_b, dist, flag, name))
+        else:
+            lines.append("%.4f %.4f %.4f %.4f %s %s" % (*position, dist, flag, name))
+    curve_points = sum(1 for row in rows if row[0])
+    return f"{points} {curve_points} 0", lines
+
+
+def write_track(path, points, seed=0, **kwargs):
+    header, lines = generate_lines(points, seed, **kwargs)
+    with open(path, 'w') as file:
+        file.write(header + "\n" + "\n".join(lines) + "\n")
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic .dat track")
+    parser.add_argument("path")
+    parser.add_argument("--points", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    write_track(args.path, args.points, args.seed)
+
+
+if __name__ == "__main__":
+    main()
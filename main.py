@@ -1,158 +1,489 @@
 import bpy
-import math
+import glob
+import itertools
 import os
+import time
+import numpy as np
 from mathutils import Vector
 from bpy_extras.io_utils import ImportHelper, ExportHelper
 from bpy.app.handlers import persistent
 
-from .utils import draw_list_with_add_remove, get_new_item_id, compute_probe_hash
-
-
-class ParsedData:
-    def __init__(self, position, handle_a, handle_b, is_curve, is_station,is_left_station,is_right_station, station_name, is_junction, is_tunnel, is_unk):
-        self.position = position
-        self.handle_a = handle_a
-        self.handle_b = handle_b
-        self.is_curve = is_curve
-        self.is_station = is_station
-        self.is_left_station = is_left_station
-        self.is_right_station = is_right_station
-        self.station_name = station_name
-        self.is_junction = is_junction
-        self.is_tunnel = is_tunnel
-        self.is_unk = is_unk
-
-
-    def get_combined_flags(self):
-        flags = 0
-        flags |= (1 << 0) if self.is_curve else 0  # Bit 0
-        flags |= (1 << 1) if self.is_station else 0  # Bit 1
-        flags |= (1 << 2) if self.is_left_station else 0  # Bit 1
-        flags |= (1 << 3) if self.is_right_station else 0  # Bit 1
-        flags |= (1 << 4) if self.is_junction else 0  # Bit 2
-        flags |= (1 << 5) if self.is_tunnel else 0  # Bit 3
-        flags |= (1 << 6) if self.is_unk else 0  # Bit 4
-        
-        return flags
-    
-    def decode_flags(combined_flags):
-        combined_flags = int(combined_flags)
-        is_curve = bool(combined_flags & (1 << 0))  # Check Bit 0
-        is_station = bool(combined_flags & (1 << 1))  # Check Bit 1
-        is_left_station = bool(combined_flags & (1 << 2))  # Check Bit 1
-        is_right_station = bool(combined_flags & (1 << 3))  # Check Bit 1
-        is_junction = bool(combined_flags & (1 << 4))  # Check Bit 2
-        is_tunnel = bool(combined_flags & (1 << 5))  # Check Bit 3
-        is_unk = bool(combined_flags & (1 << 6))  # Check Bit 4
-
-        return {
-            'is_curve': is_curve,
-            'is_station': is_station,
-            'is_left_station': is_left_station,
-            'is_right_station': is_right_station,
-            'is_junction': is_junction,
-            'is_tunnel': is_tunnel,
-            'is_unk': is_unk
-        }
-
-    def __repr__(self):
-        return (f"Position: {self.position}, Handle A: {self.handle_a}, Handle B: {self.handle_b}, "
-                f"Is Curve: {self.is_curve}, Is Station: {self.is_station}, "
-                f"Is Junction: {self.is_junction}, Is Tunnel: {self.is_tunnel}, Is Unk: {self.is_unk}")
-
-def parse_line(line):
-    tokens = line.split()
-    if tokens[0] == 'c':
-        is_curve = True
-        position = (float(tokens[1]), float(tokens[2]), float(tokens[3]))
-        handle_a = (float(tokens[4]), float(tokens[5]), float(tokens[6]))
-        handle_b = (float(tokens[7]), float(tokens[8]), float(tokens[9]))
-        
-        # position = (position[0], position[2], position[1])
-        # handle_a = (handle_a[0], handle_a[2], handle_a[1])
-        # handle_b = (handle_b[0], handle_b[2], handle_b[1])
-
-        is_station = tokens[11] == "1"
-        is_left_station = tokens[11] == "2"
-        is_right_station = tokens[11] == "6"
-        is_junction = tokens[11] == "8"
-        is_tunnel = tokens[11] == "4"
-        is_unk = tokens[11] == "32"
-
-        name = tokens[12] if is_station or is_left_station or is_right_station or is_junction else None
+from .utils import draw_list_with_add_remove, get_new_item_id
+from .track_core import (
+    ParsedData, TrackArrays, FLAG_HAS_NAME, FLAG_TOKEN_BITS, FLAG_TOKEN_MASK, compute_probe_hash, compute_probe_hashes, quantize_positions,
+    parse_header, parse_track_lines, preallocate, read_track_file, node_label, distance, export_to_text,
+    format_track_lines, chunk_rows,
+)
+from .track_batch import parse_track_files, parse_track_files_cached, write_track_files
+from .track_spatial import TrackSpatialIndex
+from .track_graph import JunctionGraph, DEFAULT_TOLERANCE
+from .track_chainage import ChainageTable
+from .track_decimate import decimate
+from .track_list_index import ListIndex
+from .track_validate import validate_track
+from . import track_cache
+from . import track_profile
+from .track_profile import stage
+
+
+def read_spline_arrays(spline):
+    bezier_points = spline.bezier_points
+    count = len(bezier_points)
+    co = np.empty(count * 3, dtype=np.float32)
+    handle_left = np.empty(count * 3, dtype=np.float32)
+    handle_right = np.empty(count * 3, dtype=np.float32)
+    radius = np.empty(count, dtype=np.float32)
+    bezier_points.foreach_get("co", co)
+    bezier_points.foreach_get("handle_left", handle_left)
+    bezier_points.foreach_get("handle_right", handle_right)
+    bezier_points.foreach_get("radius", radius)
+    return co.reshape(-1, 3), handle_left.reshape(-1, 3), handle_right.reshape(-1, 3), radius
+
+def find_unlinked_nodes(nodes, matched_ids):
+    return [node for node in nodes if node.id not in matched_ids]
+
+def snapshot_track(track):
+    # Everything export needs from bpy, as plain arrays that can leave the main thread
+    header = f"{track.total_points} {track.curve_points} {track.type}"
+    with stage("read spline"):
+        co, handle_left, handle_right, radius = read_track_arrays(track)
+    with stage("resolve nodes"):
+        sync_node_keys(track, co, radius)
+        node_names, matched_ids = resolve_track_nodes(track, radius)
+    return header, co, handle_left, handle_right, radius, node_names, matched_ids
+
+# Positions each track's node keys were last checked against. A node is found
+# by its row, node.id (the position hash) only re-finds it when rows shift
+node_key_state = {}
+
+def track_state_key(track):
+    # Track ids are only unique within their scene
+    return track.id_data.name_full, track.id
+
+def sync_node_keys(track, co, radius):
+    """Keep node rows and ids in step with the curve. Returns the number of nodes changed."""
+    key = track_state_key(track)
+    previous = node_key_state.get(key)
+    node_key_state[key] = co.copy()
+    nodes = track.nodes
+    if not len(nodes):
+        return 0
+
+    changed = 0
+    if previous is not None and len(previous) == len(co):
+        # Same points, only rehash the ones that moved
+        moved = np.flatnonzero((previous != co).any(axis=1))
+        if not len(moved):
+            return 0
+        moved = set(moved.tolist())
+        moved_nodes = [node for node in nodes if node.node_index in moved]
+        rows = np.array([node.node_index for node in moved_nodes], dtype=np.int64)
+        for node, new_id in zip(moved_nodes, compute_probe_hashes(quantize_positions(co[rows])).tolist()):
+            if node.id != str(new_id):
+                node.id = str(new_id)
+                changed += 1
+        return changed
+
+    # Points were added or removed, or this curve was not seen yet: find the
+    # nodes again by key among the named points, and rehash the ones whose
+    # key is gone but whose row still holds a named point
+    flags = radius.astype(np.int64) & 0x7F
+    named_rows = np.flatnonzero(FLAG_HAS_NAME[flags])
+    rows_by_id = {}
+    for row, key in zip(named_rows.tolist(), compute_probe_hashes(quantize_positions(co[named_rows])).tolist()):
+        rows_by_id.setdefault(str(key), row)
+    for node in nodes:
+        row = rows_by_id.get(node.id)
+        if row is not None:
+            if node.node_index != row:
+                node.node_index = row
+                changed += 1
+        elif 0 <= node.node_index < len(co) and FLAG_HAS_NAME[flags[node.node_index]]:
+            node.id = str(compute_probe_hashes(quantize_positions(co[node.node_index:node.node_index + 1]))[0])
+            changed += 1
+    return changed
+
+def resolve_track_nodes(track, radius):
+    """Export names by row: each station/junction point takes the name of the
+    node whose node_index is its row, the first such node if there are
+    several. node.id, the position hash, no longer picks the point; it only
+    re-finds a node's row when points are added or removed (sync_node_keys).
+    Returns (names by row, ids of the nodes used)."""
+    flags = radius.astype(np.int64) & 0x7F
+    node_names = {}
+    matched_ids = set()
+    for node in track.nodes:
+        row = node.node_index
+        if 0 <= row < len(flags) and FLAG_HAS_NAME[flags[row]] and row not in node_names:
+            node_names[row] = node.node_name
+            matched_ids.add(node.id)
+    return node_names, matched_ids
+
+# Issues listed one by one in the info log, the rest are only counted
+VALIDATION_REPORT_LIMIT = 20
+
+def validate_snapshot(track, co, radius):
+    # co and radius from snapshot_track, which has already synced the node keys
+    return validate_track(co, radius, [node.node_index for node in track.nodes], [node.id for node in track.nodes])
+
+def report_issues(operator, track, issues, level):
+    for check, row, message in issues[:VALIDATION_REPORT_LIMIT]:
+        operator.report({level}, f"{track.name}: {message}")
+    counts = {}
+    for check, _, _ in issues:
+        counts[check] = counts.get(check, 0) + 1
+    summary = ", ".join(f"{count} {check.replace('_', ' ')}" for check, count in counts.items())
+    operator.report({level}, f"{track.name}: {len(issues)} issue(s): {summary}")
+
+def find_track(scene, curve_object):
+    for track in scene.tracks:
+        if track.track_object == curve_object:
+            return track
+        for chunk in track.chunks:
+            if chunk.chunk_object == curve_object:
+                return track
+    return None
+
+def track_curve_objects(track):
+    if len(track.chunks):
+        return [chunk.chunk_object for chunk in track.chunks if chunk.chunk_object is not None]
+    return [track.track_object] if track.track_object is not None else []
+
+def boundary_values(parts, end):
+    # end -1 for the copy at the end of each chunk, 0 for the one at the start
+    return np.array([np.concatenate([part[0][end], part[1][end], part[2][end], [part[3][end]]]) for part in parts],
+                    dtype=np.float32)
+
+def reconcile_chunk_boundaries(track, curve_objects, parts):
+    """Both copies of a boundary point must agree before stitching drops one.
+    The copy that changed since Chunk_Reference.boundary was recorded is
+    written back over the other. When both changed, or nothing was recorded,
+    the end of the chunk is kept and the conflict shows in the status bar."""
+    chunks = [chunk for chunk in track.chunks if chunk.chunk_object is not None]
+    tails = boundary_values(parts, -1)
+    heads = np.roll(boundary_values(parts, 0), -1, axis=0)
+    ends = np.cumsum([len(part[0]) - 1 for part in parts])
+    conflicts = []
+    for k in np.flatnonzero((tails != heads).any(axis=1)).tolist():
+        recorded = np.array(chunks[k].boundary, dtype=np.float32)
+        tail_wins = not chunks[k].has_boundary or (tails[k] != recorded).any()
+        if not chunks[k].has_boundary or (tail_wins and (heads[k] != recorded).any()):
+            conflicts.append(int(ends[k] % ends[-1]))
+        value = tails[k] if tail_wins else heads[k]
+        # Overwrite the other copy: the next chunk's start or this chunk's end
+        chunk, index = ((k + 1) % len(parts), 0) if tail_wins else (k, -1)
+        point = curve_objects[chunk].data.splines.active.bezier_points[index]
+        point.co = value[0:3].tolist()
+        point.handle_left = value[3:6].tolist()
+        point.handle_right = value[6:9].tolist()
+        point.radius = float(value[9])
+        part = parts[chunk]
+        part[0][index], part[1][index], part[2][index], part[3][index] = value[0:3], value[3:6], value[6:9], value[9]
+        tails[k] = value
+    for chunk, value in zip(chunks, tails):
+        # Only write when it changed, reads also run from timers and handlers
+        if not chunk.has_boundary or (np.array(chunk.boundary, dtype=np.float32) != value).any():
+            chunk.boundary = value.tolist()
+            chunk.has_boundary = True
+    if conflicts:
+        show_status(f"TRAIN TOOLS: {track.name}: both copies of point(s) {', '.join(map(str, conflicts))} differ, kept the end of each chunk")
+
+def read_track_arrays(track):
+    """read_spline_arrays over the whole track, chunks stitched back in row order."""
+    if not len(track.chunks):
+        return read_spline_arrays(track.track_object.data.splines.active)
+    curve_objects = track_curve_objects(track)
+    parts = [read_spline_arrays(curve_object.data.splines.active) for curve_object in curve_objects]
+    reconcile_chunk_boundaries(track, curve_objects, parts)
+    # Drop the row each chunk repeats from the next one
+    return tuple(np.concatenate([part[column][:-1] for part in parts]) for column in range(4))
+
+def track_chunk_spans(track):
+    """(curve object, first row, end row) of each curve of the track, from the
+    live point counts so points added or removed in one chunk shift the rows
+    of the chunks after it. A chunk's last point repeats the next chunk's
+    first one and is not a row of its own."""
+    overlap = 1 if len(track.chunks) else 0
+    spans = []
+    start = 0
+    for curve_object in track_curve_objects(track):
+        end = start + len(curve_object.data.splines.active.bezier_points) - overlap
+        spans.append((curve_object, start, end))
+        start = end
+    return spans
+
+def track_world_positions(track, co):
+    # Track rows in world space, each chunk moved by its own object
+    world = np.empty(co.shape, dtype=np.float64)
+    for curve_object, start, end in track_chunk_spans(track):
+        matrix = np.array(curve_object.matrix_world, dtype=np.float64)
+        world[start:end] = co[start:end] @ matrix[:3, :3].T + matrix[:3, 3]
+    return world
+
+def row_object(track, row):
+    # Curve object holding a track row
+    for curve_object, start, end in track_chunk_spans(track):
+        if start <= row < end:
+            return curve_object
+    return track.track_object
+
+def object_row_offset(track, curve_object):
+    # Track row of a chunk's first point, chunk point indices are local
+    for part, start, _ in track_chunk_spans(track):
+        if part == curve_object:
+            return start
+    return 0
+
+def build_spline_per_point(spline, arrays):
+    for i in range(arrays.count):
+        bp = spline.bezier_points[i]
+        bp.co = Vector(arrays.position[i])
+        bp.handle_left = Vector(arrays.handle_a[i])
+        bp.handle_right = Vector(arrays.handle_b[i])
+        bp.radius = int(arrays.flags[i])
+        bp.handle_left_type = 'FREE'
+        bp.handle_right_type = 'FREE' 
+
+def build_spline_bulk(spline, arrays):
+    # Points created by bezier_points.add() are zero initialised, which is the
+    # FREE handle type, so only the point created with the spline needs setting.
+    # Handle types go first so no auto handle recalculation touches the handles.
+    bezier_points = spline.bezier_points
+    bezier_points[0].handle_left_type = 'FREE'
+    bezier_points[0].handle_right_type = 'FREE'
+
+    co = arrays.position
+    handle_left = arrays.handle_a
+    handle_right = arrays.handle_b
+    radius = arrays.flags.astype(np.float32)
+
+    bezier_points.foreach_set("co", co.ravel())
+    bezier_points.foreach_set("handle_left", handle_left.ravel())
+    bezier_points.foreach_set("handle_right", handle_right.ravel())
+    bezier_points.foreach_set("radius", radius)
+    spline.id_data.update_tag()
+
+# Spline settings a rebuilt spline keeps from the one it replaces
+SPLINE_SETTINGS = ("use_cyclic_u", "resolution_u", "use_smooth")
+
+def rebuild_spline(curve_data, arrays):
+    # Bezier points cannot be removed through RNA, so replace the active
+    # spline with a new one inside the same curve datablock
+    old_spline = curve_data.splines.active
+    settings = {name: getattr(old_spline, name) for name in SPLINE_SETTINGS}
+    curve_data.splines.remove(old_spline)
+    spline = curve_data.splines.new('BEZIER')
+    curve_data.splines.active = spline
+    for name, value in settings.items():
+        setattr(spline, name, value)
+    spline.bezier_points.add(arrays.count - 1)
+    build_spline_bulk(spline, arrays)
+    return spline
+
+
+
+def get_cache_dir():
+    return bpy.utils.user_resource('CONFIG', path="train_tools_cache", create=True)
+
+def parse_tracks_cached(paths, max_workers=0):
+    # Hits are memory-mapped here rather than copied back from a worker,
+    # misses are parsed and stored in the worker pool
+    cache_dir = get_cache_dir()
+    results = [track_cache.lookup(cache_dir, path) for path in paths]
+    misses = [i for i, result in enumerate(results) if result is None]
+    parsed = parse_track_files_cached(cache_dir, [paths[i] for i in misses], max_workers)
+    for i, result in zip(misses, parsed):
+        results[i] = result if isinstance(result, Exception) else result[:2]
+    return results
+
+def remove_track_object(object_name):
+    # Drop the curve datablock with the object so re-imports do not leave orphans
+    if object_name not in bpy.data.objects:
+        return
+    curve_object = bpy.data.objects[object_name]
+    curve_data = curve_object.data if curve_object.type == 'CURVE' else None
+    bpy.data.objects.remove(curve_object, do_unlink=True)
+    if curve_data is not None and curve_data.users == 0:
+        bpy.data.curves.remove(curve_data)
+
+def remove_track_objects(track):
+    for chunk in track.chunks:
+        if chunk.chunk_object is not None:
+            remove_track_object(chunk.chunk_object.name)
+    track.chunks.clear()
+    remove_track_object('Track-' + track.name)
+
+# Above this many changed rows one foreach_set of every row beats per-row writes
+INCREMENTAL_ROW_LIMIT = 1024
+
+def write_spline_rows(spline, arrays, rows):
+    bezier_points = spline.bezier_points
+    for i in rows.tolist():
+        bp = bezier_points[i]
+        bp.co = arrays.position[i].tolist()
+        bp.handle_left = arrays.handle_a[i].tolist()
+        bp.handle_right = arrays.handle_b[i].tolist()
+        bp.radius = int(arrays.flags[i])
+    spline.id_data.update_tag()
+
+def sync_track_nodes(track, arrays):
+    node_rows = arrays.node_rows()
+    node_ids = compute_probe_hashes(quantize_positions(arrays.position[node_rows])).tolist()
+    wanted = {}
+    for i, new_id in zip(node_rows, node_ids):
+        station_name = arrays.station_names[i]
+        wanted[i] = (str(new_id), station_name, f"{node_label(arrays.flags[i])} | {station_name}")
+
+    nodes = track.nodes
+    added = updated = removed = 0
+    kept = set()
+    for index in reversed(range(len(nodes))):
+        node = nodes[index]
+        target = wanted.get(node.node_index)
+        if target is None or node.node_index in kept:
+            nodes.remove(index)
+            removed += 1
+            continue
+        kept.add(node.node_index)
+        if (node.id, node.node_name, node.name) != target:
+            node.id, node.node_name, node.name = target
+            updated += 1
+
+    for i in node_rows:
+        if i in kept:
+            continue
+        item = nodes.add()
+        item.node_index = i
+        item.id, item.node_name, item.name = wanted[i]
+        added += 1
+    track.node_index = max(0, min(track.node_index, len(nodes) - 1))
+    return added, updated, removed
+
+def update_track(context, track, file_path, track_type, arrays, collection=None):
+    """Re-import into the existing curve, touching only what changed. Returns the number of rewritten points."""
+    if len(track.chunks):
+        # Chunk boundaries move with the point count, rebuild the chunks
+        track.nodes.clear()
+        build_track(context, track, file_path, track_type, arrays, collection=collection)
+        return arrays.count
+    curve_data = track.track_object.data
+    spline = curve_data.splines.active
+    old_count = len(spline.bezier_points)
+    new_count = arrays.count
+
+    if new_count < old_count:
+        with stage("bezier_points write"):
+            rebuild_spline(curve_data, arrays)
+        changed_rows = new_count
     else:
-        is_curve = False
-        position = (float(tokens[0]), float(tokens[1]), float(tokens[2]))
-        
-        # position = (position[0], position[1], position[2])
-        handle_a = position
-        handle_b = position
-
-        is_station = tokens[4] == "1"
-        is_left_station = tokens[4] == "2"
-        is_right_station = tokens[4] == "6"
-        is_junction = tokens[4] == "8"
-        is_tunnel = tokens[4] == "4"
-        is_unk = tokens[4] == "32"
-        
-        name = tokens[5] if is_station or is_left_station or is_right_station or is_junction else None
+        with stage("diff"):
+            co, handle_left, handle_right, radius = read_spline_arrays(spline)
+            changed = np.ones(new_count, dtype=bool)
+            changed[:old_count] = ((co != arrays.position[:old_count]).any(axis=1)
+                                   | (handle_left != arrays.handle_a[:old_count]).any(axis=1)
+                                   | (handle_right != arrays.handle_b[:old_count]).any(axis=1)
+                                   | (radius != arrays.flags[:old_count]))
+            rows = np.flatnonzero(changed)
+        with stage("bezier_points write"):
+            if new_count > old_count:
+                spline.bezier_points.add(new_count - old_count)
+            if len(rows) > INCREMENTAL_ROW_LIMIT:
+                build_spline_bulk(spline, arrays)
+            elif len(rows):
+                write_spline_rows(spline, arrays, rows)
+        changed_rows = len(rows)
+
+    track.name = os.path.splitext(os.path.basename(file_path))[0]
+    track.source_path = file_path
+    node_key_state.pop(track_state_key(track), None)
+    track.track_object.name = 'Track-' + track.name
+    track.type = track_type
+    track.total_points = arrays.count
+    track.curve_points = int(np.count_nonzero(arrays.is_curve))
+    with stage("sync nodes"):
+        sync_track_nodes(track, arrays)
+    return changed_rows
+
+# Cumulative length tables by scene and track id, each re-measures only the
+# segments next to points that changed since the last query
+chainage_tables = {}
+
+def get_track_chainage(track):
+    table = chainage_tables.setdefault(track_state_key(track), ChainageTable())
+    co, handle_left, handle_right, radius = read_track_arrays(track)
+    table.sync(co, handle_left, handle_right, radius)
+    return table
+
+def find_node_row(track, node_name):
+    for node in track.nodes:
+        if node.node_name == node_name:
+            return node.node_index
+    return None
+
+def new_curve_object(collection, name, arrays, use_bulk_import=True):
+    curve_data = bpy.data.curves.new('BezierCurve', type='CURVE')
+    curve_data.dimensions = '3D'  
+    curve_data.twist_mode = 'Z_UP'  
     
-    return ParsedData(position, handle_a, handle_b, is_curve, is_station, is_left_station, is_right_station, name, is_junction, is_tunnel, is_unk)
+    spline = curve_data.splines.new('BEZIER')
+    spline.bezier_points.add(arrays.count - 1 ) 
 
-def distance(p1, p2):
-    dx = p1[0] - p2[0]
-    dy = p1[1] - p2[1]
-    dz = p1[2] - p2[2]
-    return math.sqrt(dx * dx + dy * dy + dz * dz)
+    if use_bulk_import:
+        build_spline_bulk(spline, arrays)
+    else:
+        build_spline_per_point(spline, arrays)
+
+    curve_object = bpy.data.objects.new('BezierCurveObject', curve_data)
+    curve_object.name = name
+    collection.objects.link(curve_object)
+    return curve_object
+
+def build_track(context, track, file_path, track_type, arrays, use_bulk_import=True, chunk_size=None, collection=None):
+    # chunk_size None keeps the track's current split, 0 builds one curve.
+    # collection None links the new curves into context.collection
+    if chunk_size is None:
+        chunk_size = track.chunk_size
+    if collection is None:
+        collection = context.collection
+    remove_track_objects(track)
+
+    track.name = os.path.splitext(os.path.basename(file_path))[0]
+    track.source_path = file_path
+    node_key_state.pop(track_state_key(track), None)
+    track.type = track_type 
+    track.total_points = arrays.count
+    track.curve_points = int(np.count_nonzero(arrays.is_curve))
+    track.chunk_size = chunk_size
+
+    with stage("bezier_points write"):
+        if 0 < chunk_size < arrays.count:
+            # Consecutive rows, so each chunk is one contiguous stretch of track
+            # and an edit only re-evaluates the chunk object it touches
+            for chunk_index, rows in enumerate(chunk_rows(arrays.count, chunk_size)):
+                chunk = track.chunks.add()
+                chunk.chunk_object = new_curve_object(collection, f"Track-{track.name}-{chunk_index}", arrays.take(rows), use_bulk_import)
+                row = rows[-1]
+                chunk.boundary = [*arrays.position[row], *arrays.handle_a[row], *arrays.handle_b[row], arrays.flags[row]]
+                chunk.has_boundary = True
+            curve_object = track.chunks[0].chunk_object
+        else:
+            curve_object = new_curve_object(collection, 'Track-' + track.name, arrays, use_bulk_import)
 
-def export_to_text(point, distance, node_name):
-        flags = ParsedData.decode_flags(point.radius)
+    nodes = track.nodes
+    node_rows = arrays.node_rows()
+    with stage("compute_probe_hash"):
+        node_ids = compute_probe_hashes(quantize_positions(arrays.position[node_rows])).tolist()
+    with stage("nodes.add"):
+        for i, new_id in zip(node_rows, node_ids):
+            station_name = arrays.station_names[i]
+            item = nodes.add()
+            item.id = str(new_id)
+            item.node_index = i
+            item.node_name = station_name
+            item.name = f"{node_label(arrays.flags[i])} | {station_name}"
 
-        if flags["is_curve"]:
-            pos = f"{point.co[0]:.4f} {point.co[1]:.4f} {point.co[2]:.4f}"
-            handle_a = f"{point.handle_left[0]:.4f} {point.handle_left[1]:.4f} {point.handle_left[2]:.4f}"
-            handle_b = f"{point.handle_right[0]:.4f} {point.handle_right[1]:.4f} {point.handle_right[2]:.4f}"
-            flag = "0"
-            station_text = ""
-            if flags["is_station"]:
-                flag = "1" 
-                station_text = node_name
-            elif flags["is_left_station"]:
-                flag = "2" 
-                station_text = node_name
-            elif flags["is_right_station"]:
-                flag = "6" 
-                station_text = node_name
-            elif flags["is_junction"]:
-                flag = "8" 
-                station_text = node_name
-            elif flags["is_tunnel"]:
-                flag = "4" 
-            elif flags["is_unk"]:
-                flag = "32" 
-            return f"c {pos} {handle_a} {handle_b} {distance:.4f} {flag} {station_text}"
-        else:
-            pos = f"{point.co[0]:.4f} {point.co[1]:.4f} {point.co[2]:.4f}"
-            flag = "0"
-            station_text = ""
-            if flags["is_station"]:
-                flag = "1" 
-                station_text = node_name
-            elif flags["is_left_station"]:
-                flag = "2" 
-                station_text = node_name
-            elif flags["is_right_station"]:
-                flag = "6" 
-                station_text = node_name
-            elif flags["is_junction"]:
-                flag = "8" 
-                station_text = node_name
-            elif flags["is_tunnel"]:
-                flag = "4" 
-            elif flags["is_unk"]:
-                flag = "32" 
-                
-            return f"{pos} {distance:.4f} {flag} {station_text}"
+    track.track_object = curve_object
+    return curve_object
 
 
 
@@ -179,7 +510,11 @@ class TRAIN_PT_Tools(bpy.types.Panel):
 
         layout.separator()
         for prop_name in Track_Properties.__annotations__:
-            if prop_name in ["id"]:
+            if prop_name in ["id", "chunks"]:
+                continue
+            if prop_name == "chunk_size":
+                # Re-imports and watch reloads follow it, editing it here would only desync it from the chunks
+                layout.label(text=f"Chunk Size: {selected_track.chunk_size or 'single curve'}")
                 continue
             layout.prop(selected_track, prop_name)
 
@@ -188,9 +523,19 @@ class TRAIN_PT_Tools(bpy.types.Panel):
 
 
         list_col.operator("train.import")
+        list_col.operator("train.import_streaming")
+        list_col.operator("train.import_batch")
         list_col.operator("train.export")
-
-        layout.label(text="Nodes | If you move station/junction link to list will break!!!")
+        list_col.operator("train.validate")
+        list_col.operator("train.export_all")
+        list_col.operator("train.jump_to_station")
+        list_col.operator("train.check_junctions")
+        list_col.operator("train.find_route")
+        list_col.operator("train.measure_stations")
+        list_col.operator("train.cursor_to_chainage")
+        list_col.operator("train.decimate")
+
+        layout.label(text="Nodes")
         list_col, _ = draw_list_with_add_remove(layout, "train.addnode", "train.deletenode",
                                                         TRAIN_UL_NODE_LIST.bl_idname, "", selected_track, "nodes", selected_track, "node_index", rows=3)
         
@@ -211,14 +556,92 @@ class TRAIN_PT_Tools(bpy.types.Panel):
     
 
 
+# Search indexes of the track and node lists. Setting a property they read
+# drops them all, so a redraw only rebuilds an index after a change. Undo,
+# redo and file loads change the lists without update callbacks (and can
+# reuse pointers), so those drop them too. Each index also keeps a hash of
+# one int column read with foreach_get, which catches moved items
+list_indexes = {}
+
+def touch_lists(self, context):
+    list_indexes.clear()
+
+@persistent
+def reset_list_indexes(*args):
+    list_indexes.clear()
+
+def get_list_index(data, propname, build, key_column):
+    collection = getattr(data, propname)
+    column = np.empty(len(collection), dtype=np.int32)
+    collection.foreach_get(key_column, column)
+    signature = hash(column.tobytes())
+    key = (data.as_pointer(), propname)
+    cached = list_indexes.get(key)
+    if cached is None or cached[0] != signature:
+        cached = list_indexes[key] = (signature, build(collection))
+    return cached[1]
+
+def build_track_list_index(tracks):
+    return ListIndex([track.name for track in tracks], [track.type for track in tracks])
+
+def build_node_list_index(nodes):
+    positions = np.empty(len(nodes), dtype=np.int32)
+    nodes.foreach_get("node_index", positions)
+    return ListIndex([node.node_name or node.name for node in nodes],
+                     [node.name.partition(" | ")[0] for node in nodes], positions)
+
+NODE_KIND_FILTERS = {
+    'ALL': (),
+    'STATION': ("STATION", "LEFT STATION", "RIGHT STATION"),
+    'JUNCTION': ("JUNCTION",),
+}
+
 class TRAIN_UL_TRACKS_LIST(bpy.types.UIList):
     bl_idname = "TRAIN_UL_TRACKS_LIST"
     item_icon = "PRESET"
 
+    def filter_items(self, context, data, propname):
+        # filter_name matches the start of a track's name or type
+        index = get_list_index(data, propname, build_track_list_index, "id")
+        sort = 'ALPHA' if self.use_filter_sort_alpha else 'NONE'
+        return index.filter(self.filter_name, (), sort, self.bitflag_filter_item)
+
 class TRAIN_UL_NODE_LIST(bpy.types.UIList):
     bl_idname = "TRAIN_UL_NODE_LIST"
     item_icon = "PRESET"
 
+    kind_filter: bpy.props.EnumProperty(
+        name="Kind",
+        items=[
+            ('ALL', "All", "Show every node"),
+            ('STATION', "Stations", "Show station nodes only"),
+            ('JUNCTION', "Junctions", "Show junction nodes only"),
+        ],
+        default='ALL'
+    )
+
+    sort_by_position: bpy.props.BoolProperty(
+        name="Track Order",
+        description="Sort nodes by their point along the track",
+        default=False
+    )
+
+    def draw_filter(self, context, layout):
+        row = layout.row(align=True)
+        row.prop(self, "filter_name", text="")
+        row.prop(self, "use_filter_invert", text="", icon='ARROW_LEFTRIGHT')
+        layout.row(align=True).prop(self, "kind_filter", expand=True)
+        row = layout.row(align=True)
+        row.prop(self, "use_filter_sort_alpha", text="", icon='SORTALPHA')
+        row.prop(self, "sort_by_position", toggle=True)
+        row.prop(self, "use_filter_sort_reverse", text="", icon='SORT_DESC')
+
+    def filter_items(self, context, data, propname):
+        # filter_name matches the start of a node's name or kind
+        index = get_list_index(data, propname, build_node_list_index, "node_index")
+        sort = 'POSITION' if self.sort_by_position else 'ALPHA' if self.use_filter_sort_alpha else 'NONE'
+        return index.filter(self.filter_name, NODE_KIND_FILTERS[self.kind_filter], sort, self.bitflag_filter_item)
+
 
 
 class TRAIN_OT_Add_Track(bpy.types.Operator):
@@ -271,7 +694,7 @@ class TRAIN_OT_Add_Node(bpy.types.Operator):
         new_id = compute_probe_hash(data, 0)   
         item = nodes.add()
         item.id = new_id
-        item.node_index = context.scene.curve_point_index
+        item.node_index = context.scene.curve_point_index + object_row_offset(track, obj)
         item.name = f"{('STATION' if flags['is_station'] else 'LEFT STATION' if flags['is_left_station'] else 'RIGHT STATION' if flags['is_right_station'] else 'JUNCTION' if flags['is_junction'] else 'UNKNOWN')} | {item.id}"
         return {'FINISHED'}
     
@@ -287,9 +710,7 @@ class TRAIN_OT_Delete_Track(bpy.types.Operator):
     def execute(self, context):
        
         track = get_selected_track(context) 
-        object_name = 'Track-' + track.name
-        if object_name in bpy.data.objects:
-            bpy.data.objects.remove(bpy.data.objects[object_name], do_unlink=True)
+        remove_track_objects(track)
             
         tracks = context.scene.tracks
         track_index = context.scene.track_index 
@@ -327,6 +748,31 @@ class TRAIN_OT_Import_Track(bpy.types.Operator, ImportHelper):
         options={'HIDDEN'}
     )
 
+    use_bulk_import: bpy.props.BoolProperty(
+        name="Bulk Import",
+        description="Write all bezier points with foreach_set instead of one point at a time",
+        default=True
+    )
+
+    use_cache: bpy.props.BoolProperty(
+        name="Use Parse Cache",
+        description="Reuse the parsed arrays of an unchanged file instead of parsing the text again",
+        default=True
+    )
+
+    use_incremental: bpy.props.BoolProperty(
+        name="Update Existing Curve",
+        description="Diff the file into the track's existing curve and nodes instead of recreating them",
+        default=True
+    )
+
+    chunk_size: bpy.props.IntProperty(
+        name="Chunk Size",
+        description="Split the track into curve objects of this many points so edits only re-evaluate one chunk, 0 keeps one curve",
+        default=0,
+        min=0
+    )
+
     @classmethod
     def poll(cls, context):
         return get_selected_track(context) is not None
@@ -334,76 +780,258 @@ class TRAIN_OT_Import_Track(bpy.types.Operator, ImportHelper):
     def execute(self, context):
        file_path = self.filepath
        try:
-           parsed_data = []
-           with open(file_path, 'r') as file:
-                type = next(file).strip().split()[2]
-    
-                for line in file:
-                    parsed_line = parse_line(line.strip())
-                    if parsed_line is not None:
-                        parsed_data.append(parsed_line)
-
-                track = get_selected_track(context)
-
-                object_name = 'Track-' + track.name
-                if object_name in bpy.data.objects:
-                    bpy.data.objects.remove(bpy.data.objects[object_name], do_unlink=True)
-
-                track.name = os.path.splitext(os.path.basename(file_path))[0]
-                track.type = type 
-                track.total_points = len(parsed_data)
-                track.curve_points = sum(1 for data in parsed_data if data.is_curve)
-                curve_data = bpy.data.curves.new('BezierCurve', type='CURVE')
-                curve_data.dimensions = '3D'  
-                curve_data.twist_mode = 'Z_UP'  
-                
-                spline = curve_data.splines.new('BEZIER')
-                spline.bezier_points.add(len(parsed_data) - 1 ) 
-                nodes = track.nodes
-                for i, point in enumerate(parsed_data):
-                    bp = spline.bezier_points[i]
-                    bp.co = Vector(point.position)
-                    bp.handle_left = Vector(point.handle_a)
-                    bp.handle_right = Vector(point.handle_b)
-                    bp.radius = point.get_combined_flags() 
-                    bp.handle_left_type = 'FREE'
-                    bp.handle_right_type = 'FREE' 
-
-                    if point.is_station or point.is_left_station or point.is_right_station or point.is_junction:
-                        data = {}
-                        data[0] = int(bp.co[0] * 100.0) & 0xFFFFFFFF
-                        data[1] = int(bp.co[1] * 100.0) & 0xFFFFFFFF
-                        data[2] = int(bp.co[2] * 100.0) & 0xFFFFFFFF
-                        new_id = compute_probe_hash(data, 0)   
-                        item = nodes.add()
-                        item.id = new_id
-                        item.node_index = i
-                        item.node_name = point.station_name
-                        item.name = f"{('STATION' if point.is_station else 'LEFT STATION' if point.is_left_station else 'RIGHT STATION' if point.is_right_station else 'JUNCTION' if point.is_junction else 'UNKNOWN')} | {point.station_name}"
-
-
-
-                curve_object = bpy.data.objects.new('BezierCurveObject', curve_data)
-                curve_object.name = 'Track-' + track.name
-                bpy.context.collection.objects.link(curve_object)
-                
-
-               
-                track.track_object = curve_object
-                self.report({'INFO'}, "File imported successfully")
+           start_time = time.perf_counter()
+           # read_track_file_cached times its lookup, parse and store stages itself
+           cache_hit = False
+           if self.use_cache:
+               type, arrays, cache_hit = track_cache.read_track_file_cached(get_cache_dir(), file_path)
+           else:
+               with stage("read and parse file"):
+                   type, arrays = read_track_file(file_path)
+
+           track = get_selected_track(context)
+           if self.use_incremental and has_track_curve(track) and track.chunk_size == self.chunk_size:
+               changed_rows = update_track(context, track, file_path, type, arrays)
+               mode = f"incremental, {changed_rows} changed"
+           else:
+               build_track(context, track, file_path, type, arrays, self.use_bulk_import, self.chunk_size)
+               mode = "bulk" if self.use_bulk_import else "per-point"
+           elapsed = time.perf_counter() - start_time
+           if cache_hit:
+               mode += ", cached"
+           self.report({'INFO'}, f"File imported successfully ({arrays.count} points, {mode}, {elapsed:.3f}s)")
        except Exception as e:
            self.report({'ERROR'}, f"Failed to import file: {e}")
        return {'FINISHED'}
 
 
 
+class TRAIN_OT_Import_Track_Streaming(bpy.types.Operator, ImportHelper):
+    bl_idname = "train.import_streaming"
+    bl_label = "Import track (streaming)"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filter_glob: bpy.props.StringProperty(
+        default="*.dat",
+        options={'HIDDEN'}
+    )
+
+    chunk_size: bpy.props.IntProperty(
+        name="Chunk Size",
+        description="Number of lines parsed per step",
+        default=20000,
+        min=1000
+    )
+
+    use_cache: bpy.props.BoolProperty(
+        name="Use Parse Cache",
+        description="Reuse the parsed arrays of an unchanged file instead of parsing the text again",
+        default=True
+    )
+
+    _file = None
+    _timer = None
+    arrays = None
+
+    @classmethod
+    def poll(cls, context):
+        return get_selected_track(context) is not None
+
+    def execute(self, context):
+        self.track_id = get_selected_track(context).id
+        self.start_time = time.perf_counter()
+        try:
+            if self.use_cache:
+                with stage("cache lookup"):
+                    cached = track_cache.lookup(get_cache_dir(), self.filepath)
+                if cached is not None:
+                    self.track_type, arrays = cached
+                    return self.apply(context, arrays, True)
+            self.source_stat = os.stat(self.filepath)
+            self._file = open(self.filepath, 'r')
+            self.total_points, _, self.track_type = parse_header(next(self._file, ""))
+            # Columns sized once from the header, the spline is only created
+            # and written in one go when every chunk is parsed
+            self.arrays = preallocate(self.total_points, self._file)
+        except Exception as e:
+            if self._file is not None:
+                self._file.close()
+            self.report({'ERROR'}, f"Failed to import file: {e}")
+            return {'CANCELLED'}
+
+        # Nothing is created in bpy before finish, so the previous track
+        # object stays untouched until then and cancelling just drops the arrays
+        self.lines_read = 0
+
+        wm = context.window_manager
+        wm.progress_begin(0, max(self.total_points, 1))
+        self._timer = wm.event_timer_add(0.001, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.cancel(context)
+            self.report({'WARNING'}, "Import cancelled")
+            return {'CANCELLED'}
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        try:
+            lines = list(itertools.islice(self._file, self.chunk_size))
+            if not lines:
+                if self.arrays.count == 0:
+                    raise ValueError("file contains no points")
+                return self.finish(context)
+
+            parse_track_lines(lines, self.arrays, 2 + self.lines_read)
+            self.lines_read += len(lines)
+            context.window_manager.progress_update(min(self.arrays.count, self.total_points))
+            context.workspace.status_text_set(f"Importing track: {self.arrays.count}/{self.total_points} points (Esc to cancel)")
+        except Exception as e:
+            self.cancel(context)
+            self.report({'ERROR'}, f"Failed to import file: {e}")
+            return {'CANCELLED'}
+
+        return {'RUNNING_MODAL'}
+
+    def finish(self, context):
+        self.close(context)
+        arrays = self.arrays
+        self.arrays = None
+        arrays.trim()
+        if self.use_cache:
+            with stage("cache store"):
+                track_cache.store(get_cache_dir(), self.filepath, self.source_stat, self.track_type, arrays)
+        return self.apply(context, arrays, False)
+
+    def apply(self, context, arrays, cache_hit):
+        # The track may have been deleted or moved in the list while importing
+        track = next((track for track in context.scene.tracks if track.id == self.track_id), None)
+        if track is None:
+            self.report({'ERROR'}, "Failed to import file: the track was removed during the import")
+            return {'CANCELLED'}
+
+        # Same as train.import, keeping the track's current chunk split
+        if has_track_curve(track):
+            changed_rows = update_track(context, track, self.filepath, self.track_type, arrays)
+            mode = f"incremental, {changed_rows} changed"
+        else:
+            build_track(context, track, self.filepath, self.track_type, arrays)
+            mode = "bulk"
+        if cache_hit:
+            mode += ", cached"
+        elapsed = time.perf_counter() - self.start_time
+        self.report({'INFO'}, f"File imported successfully ({arrays.count} points, streaming, {mode}, {elapsed:.3f}s)")
+        return {'FINISHED'}
+
+    def close(self, context):
+        wm = context.window_manager
+        if self._timer is not None:
+            wm.event_timer_remove(self._timer)
+            self._timer = None
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+
+    def cancel(self, context):
+        self.close(context)
+        self.arrays = None
+
+
+
+class TRAIN_OT_Import_Tracks_Batch(bpy.types.Operator, ImportHelper):
+    bl_idname = "train.import_batch"
+    bl_label = "Import tracks (batch)"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filter_glob: bpy.props.StringProperty(
+        default="*.dat",
+        options={'HIDDEN'}
+    )
+
+    files: bpy.props.CollectionProperty(type=bpy.types.OperatorFileListElement, options={'HIDDEN', 'SKIP_SAVE'})
+
+    directory: bpy.props.StringProperty(subtype='DIR_PATH', options={'HIDDEN', 'SKIP_SAVE'})
+
+    worker_count: bpy.props.IntProperty(
+        name="Workers",
+        description="Number of parser processes, 0 uses every core",
+        default=0,
+        min=0
+    )
+
+    use_cache: bpy.props.BoolProperty(
+        name="Use Parse Cache",
+        description="Reuse the parsed arrays of unchanged files instead of parsing the text again",
+        default=True
+    )
+
+    def execute(self, context):
+        file_names = [file.name for file in self.files if file.name]
+        if file_names:
+            paths = [os.path.join(self.directory, name) for name in file_names]
+        else:
+            paths = sorted(glob.glob(os.path.join(self.directory, "*.dat")))
+        if not paths:
+            self.report({'ERROR'}, "No .dat files selected")
+            return {'CANCELLED'}
+
+        start_time = time.perf_counter()
+        results = parse_tracks_cached(paths, self.worker_count) if self.use_cache else parse_track_files(paths, self.worker_count)
+        parse_time = time.perf_counter() - start_time
+
+        tracks = context.scene.tracks
+        imported = 0
+        total_points = 0
+        for path, result in zip(paths, results):
+            if isinstance(result, Exception):
+                self.report({'ERROR'}, f"Failed to import {os.path.basename(path)}: {result}")
+                continue
+            track_type, arrays = result
+            item_id = get_new_item_id(tracks)
+            track = tracks.add()
+            track.id = item_id
+            track.name = f"track.{track.id}"
+            build_track(context, track, path, track_type, arrays)
+            imported += 1
+            total_points += arrays.count
+        context.scene.track_index = len(tracks) - 1
+
+        elapsed = time.perf_counter() - start_time
+        self.report({'INFO'}, f"Imported {imported}/{len(paths)} tracks ({total_points} points) in {elapsed:.3f}s, parsing took {parse_time:.3f}s")
+        return {'FINISHED'}
+
+
+
 class TRAIN_OT_Export_Track(bpy.types.Operator, ExportHelper):
     bl_idname = "train.export"
     bl_label = "Export track"
+    bl_description = "Write the selected track to a .dat file, each station/junction named after the node pointing at its point"
     bl_options = {'REGISTER', 'UNDO'}
 
     filename_ext = ".dat"
 
+    use_vectorized_export: bpy.props.BoolProperty(
+        name="Vectorized Export",
+        description="Read all bezier points with foreach_get and format them in one pass",
+        default=True
+    )
+
+    validate: bpy.props.BoolProperty(
+        name="Validate",
+        description="Check the track for duplicate points, zero length segments, conflicting flags and broken nodes before writing",
+        default=True
+    )
+
+    block_on_issues: bpy.props.BoolProperty(
+        name="Block on Issues",
+        description="Do not write the file when validation finds a problem",
+        default=False
+    )
+
     @classmethod
     def poll(cls, context):
         return get_selected_track(context) is not None
@@ -425,29 +1053,30 @@ class TRAIN_OT_Export_Track(bpy.types.Operator, ExportHelper):
                 return
             
             curve_data = curve_object.data.splines.active
+
+            start_time = time.perf_counter()
+            matched_ids = set()
+            if curve_data.bezier_points:
+                # One read serves validation and both export paths
+                _, co, handle_left, handle_right, radius, node_names, matched_ids = snapshot_track(track)
+
+            if self.validate and curve_data.bezier_points:
+                with stage("validate"):
+                    issues = validate_snapshot(track, co, radius)
+                if issues:
+                    report_issues(self, track, issues, 'ERROR' if self.block_on_issues else 'WARNING')
+                    if self.block_on_issues:
+                        return {'CANCELLED'}
             
             export_data = []
             export_data.append(f"{total_points} {curve_points} {track_type}")
-            if curve_data.bezier_points:
+            if curve_data.bezier_points and (self.use_vectorized_export or len(track.chunks)):
+                with stage("format lines"):
+                    export_data.extend(format_track_lines(co, handle_left, handle_right, radius, node_names))
+            elif curve_data.bezier_points:
                 for i in range(len(curve_data.bezier_points)):
                     point = curve_data.bezier_points[i]
-
-
-                    data = {}
-                    data[0] = int(point.co[0] * 100.0)& 0xFFFFFFFF
-                    data[1] = int(point.co[1] * 100.0) & 0xFFFFFFFF
-                    data[2] = int(point.co[2] * 100.0) & 0xFFFFFFFF
-                    index = compute_probe_hash(data, 0)   
-                  
-                    found_node = None
-                    for node in nodes:
-                        if node.id == index:
-                            found_node = node
-                            break
-                    node_name = ""
-                    if found_node:
-                        node_name = node.node_name
-                    
+                    node_name = node_names.get(i, "")
 
                     if i < len(curve_data.bezier_points) - 1:
                         next_point = curve_data.bezier_points[i + 1]
@@ -459,11 +1088,16 @@ class TRAIN_OT_Export_Track(bpy.types.Operator, ExportHelper):
                     export_data.append(export_to_text(point, dist_to_next, node_name))
 
             # Write data to file
-            with open(file_path, 'w') as file:
-                for line in export_data:
-                    file.write(f"{line}\n")
+            with stage("write file"), open(file_path, 'w') as file:
+                file.write("\n".join(export_data) + "\n")
 
-            self.report({'INFO'}, f"File exported successfully: {file_path}")
+            elapsed = time.perf_counter() - start_time
+            self.report({'INFO'}, f"File exported successfully: {file_path} ({elapsed:.3f}s)")
+
+            unlinked_nodes = find_unlinked_nodes(nodes, matched_ids)
+            if unlinked_nodes:
+                names = ", ".join(node.name for node in unlinked_nodes)
+                self.report({'WARNING'}, f"{len(unlinked_nodes)} node(s) no longer match a station/junction point: {names}")
         except Exception as e:
             self.report({'ERROR'}, f"Failed to export file: {e}")
 
@@ -471,6 +1105,103 @@ class TRAIN_OT_Export_Track(bpy.types.Operator, ExportHelper):
 
 
 
+class TRAIN_OT_Validate_Track(bpy.types.Operator):
+    bl_idname = "train.validate"
+    bl_label = "Validate track"
+    bl_description = "Check the selected track for problems that only show up in game"
+
+    @classmethod
+    def poll(cls, context):
+        track = get_selected_track(context)
+        return track is not None and has_track_curve(track)
+
+    def execute(self, context):
+        track = get_selected_track(context)
+        start_time = time.perf_counter()
+        _, co, _, _, radius, _, _ = snapshot_track(track)
+        issues = validate_snapshot(track, co, radius)
+        elapsed = time.perf_counter() - start_time
+        if issues:
+            report_issues(self, track, issues, 'WARNING')
+        else:
+            self.report({'INFO'}, f"{track.name}: no issues ({elapsed:.3f}s)")
+        return {'FINISHED'}
+
+
+class TRAIN_OT_Export_All_Tracks(bpy.types.Operator):
+    bl_idname = "train.export_all"
+    bl_label = "Export all tracks"
+
+    directory: bpy.props.StringProperty(subtype='DIR_PATH')
+
+    worker_count: bpy.props.IntProperty(
+        name="Workers",
+        description="Number of writer processes, 0 uses every core",
+        default=0,
+        min=0
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.scene.tracks) > 0
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        start_time = time.perf_counter()
+        jobs = []
+        used_names = set()
+        for track in context.scene.tracks:
+            if not track.track_object or not track.track_object.data.splines.active:
+                self.report({'WARNING'}, f"Skipped {track.name}: no track object")
+                continue
+            header, co, handle_left, handle_right, radius, node_names, matched_ids = snapshot_track(track)
+            unlinked_nodes = find_unlinked_nodes(track.nodes, matched_ids)
+            if unlinked_nodes:
+                self.report({'WARNING'}, f"{track.name}: {len(unlinked_nodes)} node(s) no longer match a station/junction point")
+            file_name = unique_file_name(track, used_names)
+            if file_name != f"{track.name}.dat":
+                self.report({'WARNING'}, f"{track.name}: another track has the same name, writing {file_name}")
+            file_path = os.path.join(self.directory, file_name)
+            jobs.append((file_path, header, co, handle_left, handle_right, radius, node_names))
+        snapshot_time = time.perf_counter() - start_time
+
+        with stage("format and write files"):
+            results = write_track_files(jobs, self.worker_count)
+
+        failed = 0
+        for job, result in zip(jobs, results):
+            file_name = os.path.basename(job[0])
+            if isinstance(result, Exception):
+                failed += 1
+                self.report({'ERROR'}, f"Failed to export {file_name}: {result}")
+            else:
+                points, seconds = result
+                self.report({'INFO'}, f"{file_name}: {points} points in {seconds:.3f}s")
+
+        elapsed = time.perf_counter() - start_time
+        self.report({'INFO'}, f"Exported {len(jobs) - failed}/{len(jobs)} tracks in {elapsed:.3f}s (snapshot {snapshot_time:.3f}s)")
+        return {'FINISHED'}
+
+
+
+def unique_file_name(track, used_names):
+    # Files are written in parallel, two tracks with one name would race for
+    # the same file. Compared case-insensitively for Windows file systems
+    file_name = f"{track.name}.dat"
+    if file_name.lower() in used_names:
+        file_name = f"{track.name}.{track.id}.dat"
+        for suffix in itertools.count(2):
+            if file_name.lower() not in used_names:
+                break
+            file_name = f"{track.name}.{track.id}.{suffix}.dat"
+    used_names.add(file_name.lower())
+    return file_name
+
+
+
 class TRAIN_OT_Show(bpy.types.Operator):
     bl_idname = "train.show"
     bl_label = "Show Track"
@@ -490,7 +1221,8 @@ class TRAIN_OT_Show(bpy.types.Operator):
     def execute(self, context):
 
         track = get_selected_track(context) 
-        track.track_object.hide_viewport = False
+        for curve_object in track_curve_objects(track):
+            curve_object.hide_viewport = False
 
      
         return {'FINISHED'}
@@ -514,12 +1246,17 @@ class TRAIN_OT_Hide(bpy.types.Operator):
     def execute(self, context):
 
         track = get_selected_track(context) 
-        track.track_object.hide_viewport = True
+        for curve_object in track_curve_objects(track):
+            curve_object.hide_viewport = True
 
         return {'FINISHED'}
 
 
 
+def has_track_curve(track):
+    curve_object = track.track_object
+    return curve_object is not None and curve_object.type == 'CURVE' and curve_object.data.splines.active is not None
+
 def get_selected_track(context) -> 'Track_Properties':
     tracks = context.scene.tracks
     track_index = context.scene.track_index
@@ -543,13 +1280,20 @@ def get_selected_node(context) -> 'Node_Properties':
 
 class Node_Properties(bpy.types.PropertyGroup):
 
-    name: bpy.props.StringProperty(name="List")
-    node_name: bpy.props.StringProperty(name="Node Name")
-    node_index: bpy.props.IntProperty(name="Node Index")
+    name: bpy.props.StringProperty(name="List", update=touch_lists)
+    node_name: bpy.props.StringProperty(name="Node Name", update=touch_lists)
+    node_index: bpy.props.IntProperty(name="Node Index", update=touch_lists)
     id: bpy.props.StringProperty(name="Id")
 
+class Chunk_Reference(bpy.types.PropertyGroup):
+    chunk_object: bpy.props.PointerProperty(type=bpy.types.Object, name="Chunk Object")
+    # co, handles and flags of the point shared with the next chunk as last
+    # stitched, saved with the file so an edit to either copy can be told apart
+    boundary: bpy.props.FloatVectorProperty(name="Boundary Point", size=10)
+    has_boundary: bpy.props.BoolProperty(name="Has Boundary Point", default=False)
+
 class Track_Properties(bpy.types.PropertyGroup):
-    name: bpy.props.StringProperty(name="Name")
+    name: bpy.props.StringProperty(name="Name", update=touch_lists)
    
     id: bpy.props.IntProperty(name="Id")
 
@@ -557,7 +1301,7 @@ class Track_Properties(bpy.types.PropertyGroup):
 
     curve_points: bpy.props.IntProperty(name="Curve Points")
 
-    type: bpy.props.StringProperty(name="Type")
+    type: bpy.props.StringProperty(name="Type", update=touch_lists)
 
     nodes: bpy.props.CollectionProperty(type=Node_Properties, name="Nodes")
 
@@ -569,6 +1313,27 @@ class Track_Properties(bpy.types.PropertyGroup):
         description="Reference to a target object"
     )
 
+    source_path: bpy.props.StringProperty(
+        name="Source File",
+        description="The .dat file this track was imported from",
+        subtype='FILE_PATH'
+    )
+
+    watch_source: bpy.props.BoolProperty(
+        name="Watch Source File",
+        description="Reload the track automatically when the source file changes on disk",
+        default=False
+    )
+
+    chunk_size: bpy.props.IntProperty(
+        name="Chunk Size",
+        description="Points per chunk object the track was imported with, 0 for a single curve",
+        default=0,
+        min=0
+    )
+
+    chunks: bpy.props.CollectionProperty(type=Chunk_Reference, name="Chunks")
+
 
 
   
@@ -578,6 +1343,27 @@ class Track_Properties(bpy.types.PropertyGroup):
 class TRAIN_OT_Set_Point_Data(bpy.types.Operator):
     bl_idname = "train.set_point_data"
     bl_label = "Set Flags"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    mode: bpy.props.EnumProperty(
+        name="Mode",
+        items=[
+            ('SINGLE', "Active Point", "Write the flags to the active point only"),
+            ('ASSIGN', "Assign", "Replace the flags of every selected point"),
+            ('SET', "Set", "Add the chosen flags to every selected point"),
+            ('CLEAR', "Clear", "Remove the chosen flags from every selected point"),
+            ('TOGGLE', "Toggle", "Flip the chosen flags on every selected point"),
+        ],
+        default='SINGLE',
+        options={'SKIP_SAVE'}
+    )
+
+    create_nodes: bpy.props.BoolProperty(
+        name="Create Nodes",
+        description="Add a node for every point that becomes a station or junction",
+        default=False,
+        options={'SKIP_SAVE'}
+    )
 
     @classmethod
     def poll(cls, context):
@@ -588,11 +1374,11 @@ class TRAIN_OT_Set_Point_Data(bpy.types.Operator):
         obj = context.active_object
         
         if not obj or obj.type != 'CURVE':
-            return
+            return {'CANCELLED'}
         
         spline = obj.data.splines.active
         if not spline:
-            return
+            return {'CANCELLED'}
         
         flags = 0
         flags |= (1 << 0) if context.scene.is_curve else 0  # Bit 0
@@ -603,6 +1389,9 @@ class TRAIN_OT_Set_Point_Data(bpy.types.Operator):
         flags |= (1 << 5) if context.scene.is_tunnel else 0  # Bit 3
         flags |= (1 << 6) if context.scene.is_unk else 0  # Bit 4
 
+        if self.mode != 'SINGLE':
+            return self.execute_bulk(context, obj, spline, flags)
+
         point = spline.bezier_points[context.scene.curve_point_index]
         
         if point:
@@ -612,6 +1401,408 @@ class TRAIN_OT_Set_Point_Data(bpy.types.Operator):
 
         return {'FINISHED'}
 
+    def execute_bulk(self, context, obj, spline, bits):
+        bezier_points = spline.bezier_points
+        count = len(bezier_points)
+        selected = np.empty(count, dtype=bool)
+        radius = np.empty(count, dtype=np.float32)
+        bezier_points.foreach_get("select_control_point", selected)
+        bezier_points.foreach_get("radius", radius)
+        rows = np.flatnonzero(selected)
+        if not len(rows):
+            self.report({'WARNING'}, "No points selected")
+            return {'CANCELLED'}
+
+        old_flags = radius.astype(np.int64) & 0x7F
+        new_flags = old_flags[rows]
+        if self.mode == 'ASSIGN':
+            new_flags[:] = bits
+        elif self.mode == 'SET':
+            new_flags |= bits
+        elif self.mode == 'CLEAR':
+            new_flags &= ~bits
+        else:
+            new_flags ^= bits
+        radius[rows] = new_flags
+        bezier_points.foreach_set("radius", radius)
+        obj.data.update_tag()
+
+        created = 0
+        if self.create_nodes:
+            track = find_track(context.scene, obj) or get_selected_track(context)
+            created = add_nodes_for_new_names(track, bezier_points, rows, old_flags[rows], new_flags, object_row_offset(track, obj))
+        changed = int(np.count_nonzero(new_flags != old_flags[rows]))
+        self.report({'INFO'}, f"Updated {changed} of {len(rows)} selected points" + (f", added {created} nodes" if created else ""))
+        return {'FINISHED'}
+
+def add_nodes_for_new_names(track, bezier_points, rows, old_flags, new_flags, row_offset=0):
+    # Points that became stations/junctions and have no node yet, hashed in one batch
+    named = FLAG_HAS_NAME[new_flags] & ~FLAG_HAS_NAME[old_flags]
+    existing = {node.node_index - row_offset for node in track.nodes}
+    rows, new_flags = rows[named], new_flags[named]
+    keep = np.array([row not in existing for row in rows.tolist()], dtype=bool)
+    rows, new_flags = rows[keep], new_flags[keep]
+    if not len(rows):
+        return 0
+
+    co = np.empty(len(bezier_points) * 3, dtype=np.float32)
+    bezier_points.foreach_get("co", co)
+    node_ids = compute_probe_hashes(quantize_positions(co.reshape(-1, 3)[rows])).tolist()
+    nodes = track.nodes
+    for row, flags, new_id in zip(rows.tolist(), new_flags.tolist(), node_ids):
+        item = nodes.add()
+        item.id = str(new_id)
+        item.node_index = row + row_offset
+        item.name = f"{node_label(flags)} | {item.id}"
+    return len(rows)
+
+
+class TRAIN_OT_Snap_To_Track(bpy.types.Operator):
+    bl_idname = "train.snap_to_track"
+    bl_label = "Snap to Track"
+    bl_description = "Move the selected point onto the nearest point of another track"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    max_distance: bpy.props.FloatProperty(
+        name="Max Distance",
+        description="Only snap to points within this distance",
+        default=10.0,
+        min=0.0
+    )
+
+    mark_junction: bpy.props.BoolProperty(
+        name="Mark as Junction",
+        description="Set the junction flag on the snapped point",
+        default=False
+    )
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj is not None and obj.type == 'CURVE' and obj.data.splines.active is not None
+
+    def execute(self, context):
+        obj = context.active_object
+        spline = obj.data.splines.active
+        point_index = get_cached_selected_point(context, spline)
+        if point_index is None:
+            self.report({'WARNING'}, "No point selected")
+            return {'CANCELLED'}
+
+        index = sync_spatial_index(context.scene)
+        own_track = find_track(context.scene, obj)
+        own_tracks = {own_track.id} if own_track is not None else set()
+        point = spline.bezier_points[point_index]
+        hits = index.query_nearest(obj.matrix_world @ point.co, 1, self.max_distance, exclude=own_tracks)
+        if not hits:
+            self.report({'WARNING'}, f"No track point within {self.max_distance:.2f}")
+            return {'CANCELLED'}
+
+        hit_distance, track_id, row = hits[0]
+        target = obj.matrix_world.inverted() @ Vector(index.grids[track_id].points[row].tolist())
+        offset = target - point.co
+        point.co = target
+        point.handle_left = point.handle_left + offset
+        point.handle_right = point.handle_right + offset
+        track = next(track for track in context.scene.tracks if track.id == track_id)
+        if self.mark_junction:
+            self.set_junction(own_track, obj, spline, point_index, track, row)
+        obj.data.update_tag()
+
+        self.report({'INFO'}, f"Snapped point {point_index} onto {track.name} point {row} ({hit_distance:.3f} away)")
+        return {'FINISHED'}
+
+    def set_junction(self, own_track, obj, spline, point_index, track, row):
+        # Junction replaces any station or tunnel token, the curve bit stays
+        old_flags = int(spline.bezier_points[point_index].radius) & 0x7F
+        new_flags = (old_flags & ~FLAG_TOKEN_MASK) | FLAG_TOKEN_BITS["8"]
+        spline.bezier_points[point_index].radius = new_flags
+        if own_track is None:
+            return
+        created = add_nodes_for_new_names(own_track, spline.bezier_points, np.array([point_index]), np.array([old_flags]),
+                                          np.array([new_flags]), object_row_offset(own_track, obj))
+        if created:
+            # Named after the junction it joins, so both tracks export the same name
+            node = own_track.nodes[-1]
+            node.node_name = next((other.node_name for other in track.nodes if other.node_index == row and other.node_name), node.id)
+
+
+class TRAIN_OT_Jump_To_Station(bpy.types.Operator):
+    bl_idname = "train.jump_to_station"
+    bl_label = "Jump to Station"
+    bl_description = "Click near a station in the viewport to select it in the node list"
+
+    pick_radius: bpy.props.IntProperty(
+        name="Pick Radius",
+        description="How close to a station the click has to be, in pixels",
+        default=20,
+        min=1
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.area is not None and context.area.type == 'VIEW_3D' and len(context.scene.tracks) > 0
+
+    def invoke(self, context, event):
+        flush_node_keys()
+        index = sync_spatial_index(context.scene)
+        self.stations = list(index.flagged_points(FLAG_HAS_NAME))
+        if not self.stations:
+            self.report({'WARNING'}, "No stations in the scene")
+            return {'CANCELLED'}
+        context.workspace.status_text_set("Click near a station, Esc to cancel")
+        context.window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type in {'ESC', 'RIGHTMOUSE'}:
+            context.workspace.status_text_set(None)
+            return {'CANCELLED'}
+        if event.type != 'LEFTMOUSE' or event.value != 'PRESS':
+            return {'PASS_THROUGH'}
+
+        region = next((region for region in context.area.regions if region.type == 'WINDOW'), None)
+        if region is None or not (region.x <= event.mouse_x < region.x + region.width
+                                  and region.y <= event.mouse_y < region.y + region.height):
+            # Clicks on the sidebar or header still work as usual
+            return {'PASS_THROUGH'}
+
+        context.workspace.status_text_set(None)
+        mouse = np.array([event.mouse_x - region.x, event.mouse_y - region.y], dtype=np.float64)
+        hit = pick_station(region, context.space_data.region_3d, self.stations, mouse, self.pick_radius)
+        if hit is None:
+            self.report({'WARNING'}, "No station near the click")
+            return {'CANCELLED'}
+
+        track_id, row, location = hit
+        for track_index, track in enumerate(context.scene.tracks):
+            if track.id != track_id:
+                continue
+            context.scene.track_index = track_index
+            for node_index, node in enumerate(track.nodes):
+                if node.node_index == row:
+                    track.node_index = node_index
+                    self.report({'INFO'}, f"{track.name}: {node.node_name}")
+                    break
+            break
+        context.scene.cursor.location = location
+        return {'FINISHED'}
+
+def pick_station(region, region_3d, stations, mouse, pick_radius):
+    # Project the indexed station points to region pixels and take the closest
+    # one to the mouse, stations are sparse enough to test them all
+    matrix = np.array(region_3d.perspective_matrix, dtype=np.float64)
+    half_size = np.array([region.width, region.height], dtype=np.float64) * 0.5
+    best = None
+    for track_id, rows, points in stations:
+        clip = points @ matrix[:, :3].T + matrix[:, 3]
+        visible = clip[:, 3] > 1e-6
+        if not visible.any():
+            continue
+        rows, points, clip = rows[visible], points[visible], clip[visible]
+        pixels = (clip[:, :2] / clip[:, 3:4] + 1.0) * half_size
+        distances = np.linalg.norm(pixels - mouse, axis=1)
+        i = int(np.argmin(distances))
+        if distances[i] <= pick_radius and (best is None or distances[i] < best[0]):
+            best = (distances[i], track_id, int(rows[i]), points[i].tolist())
+    return None if best is None else best[1:]
+
+
+
+class TRAIN_OT_Check_Junctions(bpy.types.Operator):
+    bl_idname = "train.check_junctions"
+    bl_label = "Check Junctions"
+    bl_description = "Match every junction to the tracks it joins and report the ones that join nothing"
+
+    tolerance: bpy.props.FloatProperty(
+        name="Tolerance",
+        description="How far a junction may be from the track it joins",
+        default=DEFAULT_TOLERANCE,
+        min=0.0
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.scene.tracks) > 0
+
+    def execute(self, context):
+        start = time.perf_counter()
+        graph = sync_junction_graph(context.scene, self.tolerance)
+        unlinked = graph.unlinked_junctions()
+        seconds = time.perf_counter() - start
+
+        junctions = sum(len(topology.junction_rows) for topology in graph.tracks.values())
+        names = {track.id: track.name for track in context.scene.tracks}
+        for track_id, row in unlinked[:10]:
+            self.report({'WARNING'}, f"Junction {names.get(track_id, track_id)} point {row} joins no other track")
+        if len(unlinked) > 10:
+            self.report({'WARNING'}, f"... and {len(unlinked) - 10} more unlinked junctions")
+        self.report({'INFO'}, f"{junctions} junctions, {junctions - len(unlinked)} linked, {len(unlinked)} unlinked in {seconds * 1000:.1f} ms")
+        return {'FINISHED'}
+
+
+class TRAIN_OT_Find_Route(bpy.types.Operator):
+    bl_idname = "train.find_route"
+    bl_label = "Find Route"
+    bl_description = "Shortest route between two stations across junctions"
+
+    from_station: bpy.props.StringProperty(name="From")
+    to_station: bpy.props.StringProperty(name="To")
+
+    tolerance: bpy.props.FloatProperty(
+        name="Tolerance",
+        description="How far a junction may be from the track it joins",
+        default=DEFAULT_TOLERANCE,
+        min=0.0
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.scene.tracks) > 0
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        graph = sync_junction_graph(context.scene, self.tolerance)
+        starts = graph.find_stations(self.from_station)
+        goals = graph.find_stations(self.to_station)
+        for name, vertices in ((self.from_station, starts), (self.to_station, goals)):
+            if not vertices:
+                self.report({'ERROR'}, f"No station named {name!r}")
+                return {'CANCELLED'}
+
+        routes = [route for route in (graph.shortest_path(start, goals) for start in starts) if route is not None]
+        if not routes:
+            self.report({'WARNING'}, f"{self.to_station} cannot be reached from {self.from_station}")
+            return {'CANCELLED'}
+
+        route_distance, path = min(routes, key=lambda route: route[0])
+        names = {track.id: track.name for track in context.scene.tracks}
+        track_names = [names.get(track_id, str(track_id)) for track_id, _ in itertools.groupby(path, key=lambda vertex: vertex[0])]
+        self.report({'INFO'}, f"{self.from_station} -> {self.to_station}: {route_distance:.1f} via {' > '.join(track_names)}")
+        return {'FINISHED'}
+
+
+class TRAIN_OT_Measure_Stations(bpy.types.Operator):
+    bl_idname = "train.measure_stations"
+    bl_label = "Measure Stations"
+    bl_description = "Distance along the selected track to a station, or between two of its stations"
+
+    from_station: bpy.props.StringProperty(name="From")
+    to_station: bpy.props.StringProperty(name="To", description="Leave empty to measure from the first point")
+
+    @classmethod
+    def poll(cls, context):
+        track = get_selected_track(context)
+        return track is not None and has_track_curve(track)
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        track = get_selected_track(context)
+        flush_node_keys()
+        table = get_track_chainage(track)
+        rows = []
+        for name in filter(None, (self.from_station, self.to_station)):
+            row = find_node_row(track, name)
+            if row is None or not 0 <= row < len(table.lengths):
+                self.report({'ERROR'}, f"No station named {name!r} on {track.name}")
+                return {'CANCELLED'}
+            rows.append(row)
+        if not rows:
+            self.report({'INFO'}, f"{track.name} is {table.length:.2f} long")
+        elif len(rows) == 1:
+            self.report({'INFO'}, f"{self.from_station or self.to_station} is at {table.distance_of(rows[0]):.2f} of {table.length:.2f}")
+        else:
+            self.report({'INFO'}, f"{self.from_station} -> {self.to_station}: {table.distance_between(*rows):.2f}")
+        return {'FINISHED'}
+
+
+class TRAIN_OT_Cursor_To_Chainage(bpy.types.Operator):
+    bl_idname = "train.cursor_to_chainage"
+    bl_label = "Cursor to Chainage"
+    bl_description = "Place the 3D cursor at a distance along the selected track"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    distance: bpy.props.FloatProperty(name="Distance", default=0.0, min=0.0)
+
+    @classmethod
+    def poll(cls, context):
+        track = get_selected_track(context)
+        return track is not None and has_track_curve(track)
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        track = get_selected_track(context)
+        table = get_track_chainage(track)
+        position, row = table.position_at(self.distance)
+        context.scene.cursor.location = row_object(track, row).matrix_world @ Vector(position.tolist())
+        self.report({'INFO'}, f"{self.distance:.2f} along {track.name} is between points {row} and {(row + 1) % len(table.lengths)}")
+        return {'FINISHED'}
+
+
+class TRAIN_OT_Decimate_Track(bpy.types.Operator):
+    bl_idname = "train.decimate"
+    bl_label = "Decimate Track"
+    bl_description = "Remove points that lie within a tolerance of the line through their neighbours, flagged points are always kept"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    tolerance: bpy.props.FloatProperty(
+        name="Tolerance",
+        description="Largest distance a removed point may be from the simplified track",
+        default=0.05,
+        min=0.0
+    )
+
+    @classmethod
+    def poll(cls, context):
+        track = get_selected_track(context)
+        return track is not None and has_track_curve(track) and not len(track.chunks)
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        start_time = time.perf_counter()
+        track = get_selected_track(context)
+        curve_data = track.track_object.data
+        spline = curve_data.splines.active
+        co, handle_left, handle_right, radius = read_spline_arrays(spline)
+        flags = radius.astype(np.int64) & 0x7F
+
+        keep = decimate(co, flags, self.tolerance)
+        old_count = len(co)
+        new_count = int(np.count_nonzero(keep))
+        if new_count == old_count:
+            self.report({'INFO'}, f"Nothing to remove within {self.tolerance}")
+            return {'CANCELLED'}
+
+        arrays = TrackArrays.from_columns({
+            "position": co[keep],
+            "handle_a": handle_left[keep],
+            "handle_b": handle_right[keep],
+            "flags": flags[keep].astype(np.uint8),
+            "is_curve": (flags[keep] & 1).astype(bool),
+        }, {})
+        rebuild_spline(curve_data, arrays)
+
+        # Flagged points are all kept, so every node still has a row to move to
+        new_rows = np.cumsum(keep) - 1
+        for node in track.nodes:
+            if 0 <= node.node_index < old_count:
+                node.node_index = int(new_rows[node.node_index])
+        node_key_state[track_state_key(track)] = arrays.position.copy()
+
+        track.total_points = new_count
+        track.curve_points = int(np.count_nonzero(arrays.is_curve))
+        elapsed = time.perf_counter() - start_time
+        self.report({'INFO'}, f"{old_count} -> {new_count} points ({100.0 * (1.0 - new_count / old_count):.1f}% removed) in {elapsed:.2f}s")
+        return {'FINISHED'}
+
 
 class TRAIN_PT_Location_Tools(bpy.types.Panel):
     bl_label = "Selected Point Info"
@@ -636,13 +1827,7 @@ class TRAIN_PT_Location_Tools(bpy.types.Panel):
             layout.label(text="Nothing Selected")
             return
 
-        point_index = None
-        if spline.bezier_points:
-            selected_point = None
-            for i, point in enumerate(spline.bezier_points):
-                if point.select_control_point:
-                    point_index = i
-                    break
+        point_index = get_cached_selected_point(context, spline)
 
         if point_index is None:
             layout.label(text="Nothing Selected")
@@ -651,7 +1836,13 @@ class TRAIN_PT_Location_Tools(bpy.types.Panel):
         layout.label(text=f"Point Index: {context.scene.curve_point_index}")
 
         row = layout.row()
-        row.operator("train.set_point_data")
+        row.operator("train.set_point_data").mode = 'SINGLE'
+        row.operator("train.snap_to_track")
+
+        layout.label(text="All Selected Points")
+        row = layout.row(align=True)
+        for mode, text in (('ASSIGN', "Assign"), ('SET', "Set"), ('CLEAR', "Clear"), ('TOGGLE', "Toggle")):
+            row.operator("train.set_point_data", text=text).mode = mode
        
         column = layout.column()
         column.prop(context.scene, "is_curve")
@@ -663,46 +1854,259 @@ class TRAIN_PT_Location_Tools(bpy.types.Panel):
         column.prop(context.scene, "is_unk")
        
 
+class TRAIN_PT_Profiling(bpy.types.Panel):
+    bl_label = "Profiling"
+    bl_idname = "TRAIN_PT_Profiling"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'TRAIN'
+    bl_order = 3
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+        column = layout.column()
+        column.prop(scene, "profile_enabled")
+        row = column.row()
+        row.enabled = scene.profile_enabled
+        row.prop(scene, "profile_memory")
+        column.prop(scene, "profile_log_path")
+        column.operator("train.clear_profile")
+
+        for run in reversed(track_profile.history):
+            box = layout.box()
+            peak = f", peak {run.peak_mib:.1f} MiB" if run.peak_mib is not None else ""
+            box.label(text=f"{run.label}: {run.seconds * 1000:.1f} ms, {run.calls} call(s){peak}")
+            for name, (calls, seconds) in sorted(run.stages.items(), key=lambda item: -item[1][1]):
+                box.label(text=f"    {name}: {seconds * 1000:.1f} ms x{calls}")
+
+
+class TRAIN_OT_Clear_Profile(bpy.types.Operator):
+    bl_idname = "train.clear_profile"
+    bl_label = "Clear Results"
+
+    def execute(self, context):
+        track_profile.clear()
+        return {'FINISHED'}
+
+def update_profile_settings(self, context):
+    track_profile.configure(enabled=self.profile_enabled, trace_memory=self.profile_memory,
+                            log_path=bpy.path.abspath(self.profile_log_path) if self.profile_log_path else "")
+
+# How long a message from a timer or handler stays in the status bar
+STATUS_SECONDS = 5.0
+
+def clear_status():
+    for window in bpy.context.window_manager.windows:
+        window.workspace.status_text_set(None)
+    return None
+
+def show_status(text):
+    # Timers and handlers have no operator to report through, the status bar
+    # is the closest thing to it
+    for window in bpy.context.window_manager.windows:
+        window.workspace.status_text_set(text)
+    if bpy.app.timers.is_registered(clear_status):
+        bpy.app.timers.unregister(clear_status)
+    bpy.app.timers.register(clear_status, first_interval=STATUS_SECONDS)
+
+@persistent
+def apply_profile_settings(*args):
+    # Settings are saved with the scene, the module state is not
+    update_profile_settings(bpy.context.scene, bpy.context)
+
+
+# Key of the curve the handler last scanned, the first selected point it
+# found and the spline that point is in, so updates that did not touch its
+# data can skip the selection scan and panels can draw without scanning at all
+selection_state = {"key": None, "spline": None, "point_index": None}
+
+def first_selected_point(spline):
+    bezier_points = spline.bezier_points
+    selected = np.empty(len(bezier_points), dtype=bool)
+    bezier_points.foreach_get("select_control_point", selected)
+    hits = np.flatnonzero(selected)
+    return int(hits[0]) if len(hits) else None
+
+def get_cached_selected_point(context, spline):
+    obj = context.active_object
+    if selection_state["key"] == (context.scene.name, obj.name, obj.data.name):
+        point_index = selection_state["point_index"]
+        # No hit holds for every spline, a hit only for the spline it is in
+        if point_index is None or selection_state["spline"] == spline.as_pointer():
+            return point_index
+    # The handler has not seen this curve or spline yet
+    return first_selected_point(spline)
+
+def curve_data_updated(depsgraph, curve):
+    for update in depsgraph.updates:
+        if update.id.original == curve:
+            return True
+    return False
+
 @persistent
 def update_custom_properties(scene, depsgraph):
+    with track_profile.run("update_custom_properties", merge=True):
+        sync_selection(scene, depsgraph)
+
+def sync_selection(scene, depsgraph):
     obj = bpy.context.active_object
 
     if obj and obj.type == 'CURVE': 
 
-        for spline in obj.data.splines:
-            for point in spline.bezier_points:
-                if point.select_control_point:
-                    
-                    point_index = spline.bezier_points[:].index(point)
-                    
-                    if scene.curve_point_index == point_index:
-                        return
-                    
-                    scene.curve_point_index = point_index
-
-                    flags = ParsedData.decode_flags(spline.bezier_points[point_index].radius)
-                    scene.is_curve = flags['is_curve']
-                    scene.is_station = flags['is_station']
-                    scene.is_left_station = flags['is_left_station']
-                    scene.is_right_station = flags['is_right_station']
-                    scene.is_junction = flags['is_junction']
-                    scene.is_tunnel = flags['is_tunnel']
-                    scene.is_unk = flags['is_unk']
-                    return
+        key = (scene.name, obj.name, obj.data.name)
+        if selection_state["key"] == key and not curve_data_updated(depsgraph, obj.data):
+            return
+        selection_state["key"] = key
+
+        point_index = None
+        with stage("selection scan"):
+            for spline in obj.data.splines:
+                point_index = first_selected_point(spline)
+                if point_index is not None:
+                    break
+        selection_state["point_index"] = point_index
+        selection_state["spline"] = spline.as_pointer() if point_index is not None else None
+
+        if point_index is None or scene.curve_point_index == point_index:
+            return
+            
+        scene.curve_point_index = point_index
+
+        flags = ParsedData.decode_flags(spline.bezier_points[point_index].radius)
+        scene.is_curve = flags['is_curve']
+        scene.is_station = flags['is_station']
+        scene.is_left_station = flags['is_left_station']
+        scene.is_right_station = flags['is_right_station']
+        scene.is_junction = flags['is_junction']
+        scene.is_tunnel = flags['is_tunnel']
+        scene.is_unk = flags['is_unk']
 
     
 
+# Names of the objects and curves edited since their tracks' node keys were
+# synced. The depsgraph handler only records them, a timer does the reading
+# and the RNA writes once edits pause; export and the node operators sync
+# for themselves before they use the keys
+node_keys_dirty = set()
+NODE_KEY_SYNC_DELAY = 0.5
+
+def sync_dirty_node_keys():
+    dirty = node_keys_dirty.copy()
+    node_keys_dirty.clear()
+    with track_profile.run("sync_dirty_node_keys", merge=True):
+        for scene in bpy.data.scenes:
+            for track in scene.tracks:
+                if not has_track_curve(track):
+                    continue
+                if any(part.name_full in dirty or part.data.name_full in dirty for part in track_curve_objects(track)):
+                    co, _, _, radius = read_track_arrays(track)
+                    sync_node_keys(track, co, radius)
+    return None
+
+def flush_node_keys():
+    # For operators that read node rows, so they never wait on the timer
+    if bpy.app.timers.is_registered(sync_dirty_node_keys):
+        bpy.app.timers.unregister(sync_dirty_node_keys)
+        sync_dirty_node_keys()
+
+@persistent
+def mark_node_keys_dirty(scene, depsgraph):
+    for update in depsgraph.updates:
+        if update.is_updated_geometry:
+            node_keys_dirty.add(update.id.original.name_full)
+    if node_keys_dirty and not bpy.app.timers.is_registered(sync_dirty_node_keys):
+        bpy.app.timers.register(sync_dirty_node_keys, first_interval=NODE_KEY_SYNC_DELAY)
+
+# Grid index over every track's control points in world space. Tracks are
+# re-read only when the handler saw their object or curve change
+spatial_index = TrackSpatialIndex()
+spatial_state = {"scene": None, "dirty": set(), "synced": {}}
+
+def sync_spatial_index(scene):
+    synced = spatial_state["synced"]
+    if spatial_state["scene"] != scene.name:
+        spatial_index.clear()
+        synced.clear()
+        spatial_state["scene"] = scene.name
+    dirty = spatial_state["dirty"]
+    spatial_state["dirty"] = set()
+
+    live = set()
+    for track in scene.tracks:
+        if not has_track_curve(track):
+            continue
+        live.add(track.id)
+        signature = tuple((part.name_full, part.data.name_full, part.data.splines.active.as_pointer(), len(part.data.splines.active.bezier_points))
+                          for part in track_curve_objects(track))
+        if synced.get(track.id) == signature and not dirty.intersection(name for part in signature for name in part[:2]):
+            continue
+        co, _, _, radius = read_track_arrays(track)
+        spatial_index.update(track.id, track_world_positions(track, co), radius.astype(np.int64))
+        synced[track.id] = signature
+
+    for track_id in set(spatial_index.grids) - live:
+        spatial_index.discard(track_id)
+        synced.pop(track_id, None)
+    return spatial_index
+
+# Junction graph over the same tracks, re-matched per track when the spatial
+# index hands it a new grid or the track's node names change
+junction_graph = JunctionGraph()
+
+def sync_junction_graph(scene, tolerance=DEFAULT_TOLERANCE):
+    flush_node_keys()
+    index = sync_spatial_index(scene)
+    node_names = {track.id: {node.node_index: node.node_name for node in track.nodes}
+                  for track in scene.tracks if track.id in index.grids}
+    junction_graph.set_tolerance(tolerance)
+    junction_graph.sync(index, node_names)
+    return junction_graph
+
+@persistent
+def reset_track_caches(*args):
+    # A loaded file can reuse names, track ids and pointers from the last one,
+    # so nothing read from it can be trusted to still match
+    spatial_index.clear()
+    spatial_state.update(scene=None, dirty=set(), synced={})
+    selection_state.update(key=None, spline=None, point_index=None)
+    node_key_state.clear()
+    node_keys_dirty.clear()
+    chainage_tables.clear()
+
+@persistent
+def mark_spatial_dirty(scene, depsgraph):
+    for update in depsgraph.updates:
+        if update.is_updated_geometry or update.is_updated_transform:
+            spatial_state["dirty"].add(update.id.original.name_full)
+
+
 classes = (
     TRAIN_PT_Tools,
     TRAIN_PT_Location_Tools,
+    TRAIN_PT_Profiling,
+    TRAIN_OT_Clear_Profile,
     TRAIN_OT_Set_Point_Data,
+    TRAIN_OT_Snap_To_Track,
+    TRAIN_OT_Jump_To_Station,
+    TRAIN_OT_Check_Junctions,
+    TRAIN_OT_Find_Route,
+    TRAIN_OT_Measure_Stations,
+    TRAIN_OT_Cursor_To_Chainage,
+    TRAIN_OT_Decimate_Track,
     TRAIN_OT_Add_Track,
     TRAIN_OT_Delete_Track,
     TRAIN_OT_Hide,
     TRAIN_OT_Show,
     TRAIN_OT_Import_Track,
+    TRAIN_OT_Import_Track_Streaming,
+    TRAIN_OT_Import_Tracks_Batch,
     TRAIN_OT_Export_Track,
+    TRAIN_OT_Validate_Track,
+    TRAIN_OT_Export_All_Tracks,
     Node_Properties,
+    Chunk_Reference,
     Track_Properties,
     TRAIN_UL_TRACKS_LIST,
     TRAIN_UL_NODE_LIST,
@@ -729,9 +2133,13 @@ def on_update(self, context, flag_name):
 
 def register():
     for cls in classes:
+        if issubclass(cls, bpy.types.Operator):
+            track_profile.instrument(cls, cls.bl_idname)
         bpy.utils.register_class(cls)
 
     bpy.app.handlers.depsgraph_update_post.append(update_custom_properties)
+    bpy.app.handlers.depsgraph_update_post.append(mark_spatial_dirty)
+    bpy.app.handlers.depsgraph_update_post.append(mark_node_keys_dirty)
     bpy.types.Scene.tracks = bpy.props.CollectionProperty(type=Track_Properties, name="Tracks")
     bpy.types.Scene.track_index = bpy.props.IntProperty(name="Track Index", default=0)
     bpy.types.Scene.curve_point_index = bpy.props.IntProperty(name="Track Index", default=0)
@@ -744,6 +2152,15 @@ def register():
     bpy.types.Scene.is_tunnel = bpy.props.BoolProperty(name="Is Tunnel", default=False,update=lambda self, context: on_update(self, context, 'is_tunnel'))
     bpy.types.Scene.is_unk = bpy.props.BoolProperty(name="Is Unk", default=False,update=lambda self, context: on_update(self, context, 'is_unk'))
     bpy.types.Scene.updating_flags = bpy.props.BoolProperty(default=False)
+
+    bpy.types.Scene.profile_enabled = bpy.props.BoolProperty(name="Record Timings", description="Time every TRAIN operator and the selection handler stage by stage", default=False, update=update_profile_settings)
+    bpy.types.Scene.profile_memory = bpy.props.BoolProperty(name="Trace Memory", description="Record peak Python memory with tracemalloc, slows recorded runs down", default=False, update=update_profile_settings)
+    bpy.types.Scene.profile_log_path = bpy.props.StringProperty(name="JSON Log", description="Append every recorded run to this file as one JSON object per line", subtype='FILE_PATH', update=update_profile_settings)
+    bpy.app.handlers.load_post.append(apply_profile_settings)
+    track_profile.configure(report=show_status)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post, bpy.app.handlers.load_post):
+        handlers.append(reset_list_indexes)
+    bpy.app.handlers.load_post.append(reset_track_caches)
     
 
 def unregister():
@@ -751,6 +2168,10 @@ def unregister():
         bpy.utils.unregister_class(cls)
 
     bpy.app.handlers.depsgraph_update_post.remove(update_custom_properties)
+    bpy.app.handlers.depsgraph_update_post.remove(mark_spatial_dirty)
+    bpy.app.handlers.depsgraph_update_post.remove(mark_node_keys_dirty)
+    if bpy.app.timers.is_registered(sync_dirty_node_keys):
+        bpy.app.timers.unregister(sync_dirty_node_keys)
     del bpy.types.Scene.tracks
     del bpy.types.Scene.track_index
     del bpy.types.Scene.curve_point_index
@@ -758,13 +2179,27 @@ def unregister():
     del bpy.types.Scene.is_curve
     del bpy.types.Scene.is_station
     del bpy.types.Scene.is_left_station
-    del bpy.types.Scene.is_left_station
+    del bpy.types.Scene.is_right_station
     del bpy.types.Scene.is_junction
     del bpy.types.Scene.is_tunnel
     del bpy.types.Scene.is_unk
 
     del bpy.types.Scene.updating_flags
 
+    bpy.app.handlers.load_post.remove(apply_profile_settings)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post, bpy.app.handlers.load_post):
+        handlers.remove(reset_list_indexes)
+    bpy.app.handlers.load_post.remove(reset_track_caches)
+    reset_track_caches()
+    list_indexes.clear()
+    track_profile.flush_log()
+    track_profile.configure(enabled=False)
+    if bpy.app.timers.is_registered(clear_status):
+        bpy.app.timers.unregister(clear_status)
+    del bpy.types.Scene.profile_enabled
+    del bpy.types.Scene.profile_memory
+    del bpy.types.Scene.profile_log_path
+
 
 if __name__ == "__main__":
     register()
@@ -0,0 +1,78 @@
+import os
+import sys
+
+import numpy as np
+
+# track_decimate has no bpy dependency, import it without the addon package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import track_decimate  # noqa: E402
+
+
+def point_segment_distance(p, a, b):
+    ab = b - a
+    length_squared = float(ab @ ab)
+    t = 0.0 if length_squared == 0 else min(max(float((p - a) @ ab) / length_squared, 0.0), 1.0)
+    return float(np.linalg.norm(p - a - ab * t))
+
+
+def reference_decimate(co, flags, tolerance):
+    # Textbook recursive Douglas-Peucker between each pair of protected points
+    co = np.asarray(co, dtype=np.float64)
+    keep = track_decimate.protected_points(flags)
+    if len(co) < 3:
+        keep[:] = True
+        return keep
+
+    def simplify(start, end):
+        if end - start < 2:
+            return
+        distances = [point_segment_distance(co[i], co[start], co[end]) for i in range(start + 1, end)]
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            simplify(start, split)
+            simplify(split, end)
+
+    anchors = np.flatnonzero(keep).tolist()
+    for start, end in zip(anchors, anchors[1:]):
+        simplify(start, end)
+    return keep
+
+
+def random_track(rng, count, flagged=0.02):
+    co = np.cumsum(rng.normal(0.0, 1.0, size=(count, 3)), axis=0)
+    flags = np.zeros(count, dtype=np.int64)
+    marked = rng.random(count) < flagged
+    flags[marked] = rng.choice([1, 1 << 1, 1 << 4, 1 << 5], size=int(marked.sum()))
+    return co, flags
+
+
+def test_matches_recursive_reference():
+    rng = np.random.default_rng(0)
+    for count in (3, 10, 200, 600):
+        co, flags = random_track(rng, count)
+        for tolerance in (0.0, 0.5, 2.0, 10.0):
+            expected = reference_decimate(co, flags, tolerance)
+            assert track_decimate.decimate(co, flags, tolerance).tolist() == expected.tolist()
+
+
+def test_unflagged_straight_line_keeps_the_ends():
+    co = np.stack([np.arange(50.0), np.zeros(50), np.zeros(50)], axis=1)
+    keep = track_decimate.decimate(co, np.zeros(50, dtype=np.int64), 0.01)
+    assert np.flatnonzero(keep).tolist() == [0, 49]
+
+
+def test_protected_points():
+    flags = np.zeros(10, dtype=np.int64)
+    flags[3] = 1        # curve point, its neighbours shape its segments
+    flags[7] = 1 << 4   # junction
+    flags[8] = 0x80     # above the 7 flag bits, not a flag
+    assert np.flatnonzero(track_decimate.protected_points(flags)).tolist() == [0, 2, 3, 4, 7, 9]
+
+
+def test_short_tracks_are_kept():
+    for count in (0, 1, 2):
+        co = np.zeros((count, 3))
+        assert track_decimate.decimate(co, np.zeros(count, dtype=np.int64), 100.0).all()
@@ -0,0 +1,135 @@
+import os
+import sys
+
+import numpy as np
+
+# track_graph and track_spatial have no bpy dependency, import them without
+# the addon package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from track_graph import JunctionGraph  # noqa: E402
+from track_spatial import TrackSpatialIndex  # noqa: E402
+
+JUNCTION = 1 << 4
+STATION = 1 << 1
+TOLERANCE = 1.0
+
+
+def random_tracks(rng, track_count=8, point_count=300):
+    tracks = {}
+    for key in range(track_count):
+        start = rng.uniform(0.0, 200.0, size=3) * [1.0, 1.0, 0.05]
+        points = start + np.cumsum(rng.normal(0.0, 2.0, size=(point_count, 3)) * [1.0, 1.0, 0.1], axis=0)
+        flags = np.zeros(point_count, dtype=np.int64)
+        flags[rng.choice(point_count, 5, replace=False)] = STATION
+        tracks[key] = [points, flags]
+    # Put junctions right next to points of other tracks
+    for key, (points, flags) in tracks.items():
+        for row in rng.choice(np.flatnonzero(flags == 0), 6, replace=False).tolist():
+            flags[row] = JUNCTION
+            other = int(rng.choice([other for other in tracks if other != key]))
+            other_points = tracks[other][0]
+            points[row] = other_points[rng.integers(len(other_points))] + rng.normal(0.0, 0.2, size=3)
+    return tracks
+
+
+def node_names(tracks):
+    return {key: {row: f"S{key}-{row}" for row in np.flatnonzero(flags == STATION).tolist()}
+            for key, (_, flags) in tracks.items()}
+
+
+def load_index(tracks):
+    index = TrackSpatialIndex()
+    for key, (points, flags) in tracks.items():
+        index.update(key, points, flags)
+    return index
+
+
+def brute_force_links(tracks, tolerance):
+    links = {}
+    for key, (points, flags) in tracks.items():
+        for row in np.flatnonzero(flags == JUNCTION).tolist():
+            for other, (other_points, _) in tracks.items():
+                if other == key:
+                    continue
+                distances = np.linalg.norm(other_points - points[row], axis=1)
+                nearest = int(np.argmin(distances))
+                if distances[nearest] <= tolerance:
+                    links.setdefault((key, row), set()).add((other, nearest))
+                    links.setdefault((other, nearest), set()).add((key, row))
+    return links
+
+
+def fresh_graph(index, names, tolerance=TOLERANCE):
+    graph = JunctionGraph(tolerance)
+    graph.sync(index, names)
+    return graph
+
+
+def assert_same_graph(graph, other):
+    assert graph.links == other.links
+    assert sorted(graph.tracks) == sorted(other.tracks)
+    assert graph.build_adjacency() == other.build_adjacency()
+
+
+def test_links_match_brute_force():
+    tracks = random_tracks(np.random.default_rng(0))
+    graph = fresh_graph(load_index(tracks), node_names(tracks))
+    assert graph.links == brute_force_links(tracks, TOLERANCE)
+    assert graph.links
+
+
+def test_incremental_sync_matches_fresh_build():
+    rng = np.random.default_rng(1)
+    tracks = random_tracks(rng)
+    index = load_index(tracks)
+    graph = fresh_graph(index, node_names(tracks))
+
+    # Move a track onto its neighbours, so junctions elsewhere start or stop
+    # reaching it
+    points, flags = tracks[2]
+    points += tracks[3][0].mean(axis=0) - points.mean(axis=0)
+    index.update(2, points, flags)
+    assert graph.sync(index, node_names(tracks)) >= {2}
+    assert_same_graph(graph, fresh_graph(index, node_names(tracks)))
+
+    # Turn a junction into a plain point and a station into a junction
+    points, flags = tracks[5]
+    flags[np.flatnonzero(flags == JUNCTION)[0]] = 0
+    flags[np.flatnonzero(flags == STATION)[0]] = JUNCTION
+    index.update(5, points, flags)
+    graph.sync(index, node_names(tracks))
+    assert_same_graph(graph, fresh_graph(index, node_names(tracks)))
+
+    # Remove one track and add another
+    del tracks[0]
+    index.discard(0)
+    tracks[9] = random_tracks(rng, 2)[1]
+    index.update(9, *tracks[9])
+    graph.sync(index, node_names(tracks))
+    assert_same_graph(graph, fresh_graph(index, node_names(tracks)))
+    assert graph.links == brute_force_links(tracks, TOLERANCE)
+
+
+def test_unchanged_sync_rematches_nothing():
+    tracks = random_tracks(np.random.default_rng(2))
+    index = load_index(tracks)
+    graph = fresh_graph(index, node_names(tracks))
+    assert graph.sync(index, node_names(tracks)) == set()
+
+    # Renaming a station re-syncs only its track
+    names = node_names(tracks)
+    row = next(iter(names[4]))
+    names[4][row] = "Renamed"
+    assert graph.sync(index, names) == {4}
+    assert graph.find_stations("Renamed") == [(4, row)]
+
+
+def test_tolerance_change_matches_fresh_build():
+    tracks = random_tracks(np.random.default_rng(3))
+    index = load_index(tracks)
+    graph = fresh_graph(index, node_names(tracks))
+    for tolerance in (0.3, 3.0):
+        graph.set_tolerance(tolerance)
+        assert_same_graph(graph, fresh_graph(index, node_names(tracks), tolerance))
+        assert graph.links == brute_force_links(tracks, tolerance)
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import numpy as np
+
+# track_core has no bpy dependency, import it without the addon package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import track_core  # noqa: E402
+
+
+def scalar_hashes(keys):
+    return [int(track_core.compute_probe_hash({0: x, 1: y, 2: z}, 0)) for x, y, z in keys.tolist()]
+
+
+def assert_hashes_match(keys):
+    keys = np.asarray(keys, dtype=np.int64) & 0xFFFFFFFF
+    assert track_core.compute_probe_hashes(keys).tolist() == scalar_hashes(keys)
+
+
+def test_random_keys():
+    rng = np.random.default_rng(0)
+    assert_hashes_match(rng.integers(0, 1 << 32, size=(10000, 3), dtype=np.int64))
+
+
+def test_edge_keys():
+    values = [0, 1, 2, 0x7FFFFFFF, 0x80000000, 0xFFFFFFFE, 0xFFFFFFFF, 0xDEADBEEF]
+    keys = np.array([(x, y, z) for x in values for y in values for z in values], dtype=np.int64)
+    assert_hashes_match(keys)
+
+
+def test_negative_and_large_positions():
+    rng = np.random.default_rng(1)
+    co = np.concatenate([
+        rng.uniform(-20000.0, 20000.0, size=(5000, 3)),
+        [[0.0, 0.0, 0.0], [-0.0, -0.001, 0.001], [-0.009, -0.01, -0.011]],
+        [[-21474836.47, 21474836.47, -1e6], [1e6, -1e6, 42949672.95]],
+    ]).astype(np.float32)
+    keys = track_core.quantize_positions(co)
+    expected = np.array([[int(value * 100.0) & 0xFFFFFFFF for value in point] for point in co.tolist()], dtype=np.int64)
+    assert keys.tolist() == expected.tolist()
+    assert_hashes_match(keys)
+
+
+def test_initval():
+    rng = np.random.default_rng(2)
+    keys = rng.integers(0, 1 << 32, size=(500, 3), dtype=np.int64)
+    for initval in (1, 0x12345678, 0xFFFFFFFF):
+        expected = [int(track_core.compute_probe_hash({0: x, 1: y, 2: z}, initval)) for x, y, z in keys.tolist()]
+        assert track_core.compute_probe_hashes(keys, initval).tolist() == expected
@@ -0,0 +1,103 @@
+import os
+import sys
+
+import numpy as np
+
+# track_validate has no bpy dependency, import it without the addon package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import track_core  # noqa: E402
+from track_validate import CHECKS, validate_track  # noqa: E402
+
+STATION = 1 << 1
+JUNCTION = 1 << 4
+TUNNEL = 1 << 5
+COUNT = 100
+
+
+def clean_track():
+    # A loop with a station and a junction, each with a matching node
+    angles = np.linspace(0.0, 2.0 * np.pi, COUNT, endpoint=False)
+    co = np.stack([np.cos(angles) * 100.0, np.sin(angles) * 100.0, np.zeros(COUNT)], axis=1).astype(np.float32)
+    radius = np.zeros(COUNT, dtype=np.float32)
+    radius[10] = STATION | 1
+    radius[50] = JUNCTION
+    return co, radius, [10, 50]
+
+
+def node_ids(co, rows):
+    return [str(node_id) for node_id in track_core.compute_probe_hashes(track_core.quantize_positions(co[rows])).tolist()]
+
+
+def issues_of(co, radius, rows, ids=None):
+    return validate_track(co, radius, rows, node_ids(co, rows) if ids is None else ids)
+
+
+def test_clean_track():
+    co, radius, rows = clean_track()
+    assert issues_of(co, radius, rows) == []
+
+
+def test_duplicate_point():
+    co, radius, rows = clean_track()
+    co[31] = co[30]
+    co[-1] = co[0]
+    issues = issues_of(co, radius, rows)
+    # A duplicate is not also reported as a zero length segment
+    assert [(check, row) for check, row, _ in issues] == [("duplicate_point", 30), ("duplicate_point", COUNT - 1)]
+
+
+def test_zero_length_segment():
+    co, radius, rows = clean_track()
+    co[21] = co[20] + np.float32(0.00001)
+    issues = issues_of(co, radius, rows)
+    assert [(check, row) for check, row, _ in issues] == [("zero_length_segment", 20)]
+
+
+def test_conflicting_flags():
+    co, radius, rows = clean_track()
+    radius[10] = STATION | TUNNEL | 1
+    radius[70] = JUNCTION | 1
+    issues = issues_of(co, radius, rows)
+    # The curve bit is not a token, one token plus the curve bit is fine
+    assert [(check, row) for check, row, _ in issues] == [("conflicting_flags", 10)]
+
+
+def test_unmatched_nodes():
+    co, radius, rows = clean_track()
+    ids = node_ids(co, rows)
+    moved = co.copy()
+    moved[50] += 5.0
+    issues = validate_track(moved, radius, rows + [COUNT + 3, 60], ids + ["1", "2"])
+    assert [(check, row) for check, row, _ in issues] == [
+        ("unmatched_node", 50),
+        ("unmatched_node", COUNT + 3),
+        ("unmatched_node", 60),
+    ]
+    messages = [message for _, _, message in issues]
+    assert "no longer matches" in messages[0]
+    assert "past the last point" in messages[1]
+    assert "not a station or junction" in messages[2]
+
+
+def test_hash_collision():
+    co, radius, rows = clean_track()
+    # Same quantized position two named points apart, not consecutive
+    radius[80] = STATION
+    co[80] = co[10]
+    issues = issues_of(co, radius, rows + [80])
+    assert [(check, row) for check, row, _ in issues] == [("hash_collision", 80)]
+    assert "like point 10" in issues[0][2]
+
+
+def test_issues_are_ordered_by_check():
+    co, radius, rows = clean_track()
+    co[5] = co[4]
+    radius[40] = STATION | JUNCTION
+    radius[80] = JUNCTION
+    co[80] = co[50]
+    co[91] = co[90] + np.float32(0.00001)
+    issues = validate_track(co, radius, rows + [COUNT], node_ids(co, rows) + ["1"])
+    checks = [check for check, _, _ in issues]
+    assert checks == sorted(checks, key=CHECKS.index)
+    assert set(checks) == set(CHECKS)
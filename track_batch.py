@@ -0,0 +1,75 @@
+"""Parse and write many .dat files in a process pool. No bpy dependency."""
+import multiprocessing
+import os
+import runpy
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    from . import track_cache, track_core
+except ImportError:
+    import track_cache
+    import track_core
+
+WORKER_BOOTSTRAP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "track_worker.py")
+
+
+def resolve_workers(max_workers, jobs):
+    return max(1, min(max_workers or os.cpu_count() or 1, jobs))
+
+
+def call_or_error(func, *args):
+    try:
+        return func(*args)
+    except Exception as e:
+        return e
+
+
+def run_jobs(func, jobs, max_workers=0):
+    """Run func(*job) for every job, in a process pool when there is more
+    than one job. func must be a module-level function of a bpy-free addon
+    module so the workers can unpickle it. Results come back in job order; a
+    job that raised returns its exception instead."""
+    results = [None] * len(jobs)
+    if not jobs:
+        return results
+
+    workers = resolve_workers(max_workers, len(jobs))
+    if workers == 1:
+        return [call_or_error(func, *job) for job in jobs]
+
+    # Always spawn, forking Blender's process with its threads is unsafe.
+    # run_path is stdlib, so the workers can run it before they can import
+    # anything of the addon
+    bootstrap = (WORKER_BOOTSTRAP, {"PACKAGE": track_core.__package__ or ""}, "__track_worker__")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=runpy.run_path, initargs=bootstrap) as pool:
+        futures = [pool.submit(func, *job) for job in jobs]
+        for i, future in enumerate(futures):
+            try:
+                results[i] = future.result()
+            except BrokenProcessPool:
+                # Could not start workers here, finish in this process
+                results[i] = call_or_error(func, *jobs[i])
+            except Exception as e:
+                results[i] = e
+    return results
+
+
+def parse_track_files(paths, max_workers=0):
+    """Parse .dat files in parallel. Returns (track_type, TrackArrays) or the exception, per path."""
+    return run_jobs(track_core.read_track_file, [(path,) for path in paths], max_workers)
+
+
+def parse_track_files_cached(cache_dir, paths, max_workers=0):
+    """parse_track_files through the parse cache. Each worker looks its file
+    up and stores it on a miss, so hashing and saving run in parallel too.
+    Returns (track_type, TrackArrays, hit) or the exception, per path."""
+    return run_jobs(track_cache.read_track_file_cached, [(cache_dir, path) for path in paths], max_workers)
+
+
+def write_track_files(jobs, max_workers=0):
+    """Format and write track snapshots in parallel. Each job is the argument
+    tuple of track_core.write_track_arrays. Returns (points, seconds) or the
+    exception, per job."""
+    return run_jobs(track_core.write_track_arrays, jobs, max_workers)
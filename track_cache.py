@@ -0,0 +1,186 @@
+"""On-disk cache of parsed .dat files, stored as memory-mappable .npy columns.
+
+Entries are keyed by the absolute source path and validated against its size,
+mtime and a BLAKE2 content hash, so a touched but unchanged file still hits.
+Least recently used entries are evicted once the cache grows past its size
+limit. No bpy dependency.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+try:
+    from .track_core import TrackArrays, read_track_file
+    from .track_profile import stage
+except ImportError:
+    from track_core import TrackArrays, read_track_file
+    from track_profile import stage
+
+CACHE_VERSION = 1
+DEFAULT_SIZE_LIMIT = 1024 * 1024 * 1024
+
+# Bytes in each cache directory, scanned on the first store and then kept up
+# to date by store, so the directory is only walked again to evict
+cache_totals = {}
+
+
+def file_digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def entry_dir(cache_dir, path):
+    key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, key)
+
+
+def read_meta(entry):
+    try:
+        with open(os.path.join(entry, "meta.json"), 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_meta(entry, meta):
+    with open(os.path.join(entry, "meta.json"), 'w') as file:
+        json.dump(meta, file)
+
+
+def lookup(cache_dir, path):
+    """Return (track_type, TrackArrays) with memory-mapped columns, or None on a miss."""
+    entry = entry_dir(cache_dir, path)
+    meta = read_meta(entry)
+    if meta is None or meta.get("version") != CACHE_VERSION or meta.get("path") != os.path.abspath(path):
+        return None
+
+    try:
+        source_stat = os.stat(path)
+    except OSError:
+        return None
+    if meta["size"] != source_stat.st_size:
+        return None
+    if meta["mtime_ns"] != source_stat.st_mtime_ns:
+        if meta["content_hash"] != file_digest(path):
+            return None
+        meta["mtime_ns"] = source_stat.st_mtime_ns
+
+    try:
+        columns = {name: np.load(os.path.join(entry, f"{name}.npy"), mmap_mode='r') for name in TrackArrays.COLUMNS}
+    except (OSError, ValueError):
+        return None
+
+    # Access time drives LRU eviction, a read-only or full cache only loses that
+    meta["accessed"] = time.time()
+    try:
+        write_meta(entry, meta)
+    except OSError:
+        pass
+    station_names = dict(zip(meta["station_rows"], meta["station_names"]))
+    return meta["track_type"], TrackArrays.from_columns(columns, station_names)
+
+
+def store(cache_dir, path, source_stat, track_type, arrays, size_limit=DEFAULT_SIZE_LIMIT):
+    """Cache parsed arrays for path. source_stat is os.stat(path) taken before
+    parsing; nothing is stored if the file changed while it was parsed.
+    The cache is best effort, I/O errors only make this return False."""
+    try:
+        return write_entry(cache_dir, path, source_stat, track_type, arrays, size_limit)
+    except OSError:
+        return False
+
+
+def write_entry(cache_dir, path, source_stat, track_type, arrays, size_limit):
+    content_hash = file_digest(path)
+    current_stat = os.stat(path)
+    if (current_stat.st_size, current_stat.st_mtime_ns) != (source_stat.st_size, source_stat.st_mtime_ns):
+        return False
+
+    entry = entry_dir(cache_dir, path)
+    temp_entry = f"{entry}.{os.getpid()}.tmp"
+    shutil.rmtree(temp_entry, ignore_errors=True)
+    os.makedirs(temp_entry)
+    for name in TrackArrays.COLUMNS:
+        np.save(os.path.join(temp_entry, f"{name}.npy"), np.ascontiguousarray(getattr(arrays, name)))
+    station_rows = arrays.node_rows()
+    write_meta(temp_entry, {
+        "version": CACHE_VERSION,
+        "path": os.path.abspath(path),
+        "size": source_stat.st_size,
+        "mtime_ns": source_stat.st_mtime_ns,
+        "content_hash": content_hash,
+        "track_type": track_type,
+        "station_rows": station_rows,
+        "station_names": [arrays.station_names[row] for row in station_rows],
+        "accessed": time.time(),
+    })
+    total = cache_total(cache_dir)
+    old_size = entry_size(entry) if os.path.isdir(entry) else 0
+    new_size = entry_size(temp_entry)
+    shutil.rmtree(entry, ignore_errors=True)
+    os.replace(temp_entry, entry)
+
+    cache_totals[cache_dir] = total - old_size + new_size
+    if cache_totals[cache_dir] > size_limit:
+        evict(cache_dir, size_limit)
+    return True
+
+
+def entry_size(entry):
+    return sum(os.path.getsize(os.path.join(entry, name)) for name in os.listdir(entry))
+
+
+def list_entries(cache_dir):
+    """(accessed, entry, size) of every finished entry in cache_dir."""
+    entries = []
+    for name in os.listdir(cache_dir):
+        entry = os.path.join(cache_dir, name)
+        if not os.path.isdir(entry) or name.endswith(".tmp"):
+            continue
+        meta = read_meta(entry)
+        accessed = meta.get("accessed", 0.0) if meta else 0.0
+        entries.append((accessed, entry, entry_size(entry)))
+    return entries
+
+
+def cache_total(cache_dir):
+    total = cache_totals.get(cache_dir)
+    if total is None:
+        total = cache_totals[cache_dir] = sum(size for _, _, size in list_entries(cache_dir))
+    return total
+
+
+def evict(cache_dir, size_limit=DEFAULT_SIZE_LIMIT):
+    # Rescans rather than trusting cache_totals, other Blender instances may
+    # share the directory
+    entries = list_entries(cache_dir)
+    total = sum(size for _, _, size in entries)
+    for _, entry, size in sorted(entries):
+        if total <= size_limit:
+            break
+        # Memory-mapped entries cannot be removed on Windows while in use
+        shutil.rmtree(entry, ignore_errors=True)
+        if not os.path.exists(entry):
+            total -= size
+    cache_totals[cache_dir] = total
+
+
+def read_track_file_cached(cache_dir, path, size_limit=DEFAULT_SIZE_LIMIT):
+    """read_track_file that goes through the cache. Returns (track_type, arrays, hit)."""
+    with stage("cache lookup"):
+        cached = lookup(cache_dir, path)
+    if cached is not None:
+        return cached + (True,)
+    source_stat = os.stat(path)
+    with stage("read and parse file"):
+        track_type, arrays = read_track_file(path)
+    with stage("cache store"):
+        store(cache_dir, path, source_stat, track_type, arrays, size_limit)
+    return track_type, arrays, False
@@ -0,0 +1,115 @@
+import numpy as np
+
+# Chords per Bezier segment when measuring curve points
+BEZIER_SAMPLES = 16
+# Segments sampled per NumPy batch, bounds the (segments, samples, 3) temporaries
+SAMPLE_BLOCK_SIZE = 65536
+
+
+def bezier_points(p0, p1, p2, p3, t):
+    # Cubic Bezier at parameters t for every segment: (segments, len(t), 3)
+    t = t[None, :, None]
+    u = 1.0 - t
+    return (u * u * u) * p0[:, None] + (3.0 * u * u * t) * p1[:, None] + (3.0 * u * t * t) * p2[:, None] + (t * t * t) * p3[:, None]
+
+
+def segment_controls(co, handle_left, handle_right, rows):
+    # Segment i runs from point i to point i + 1, the last one back to the first
+    following = (rows + 1) % len(co)
+    return co[rows], handle_right[rows], handle_left[following], co[following]
+
+
+def segment_lengths(co, handle_left, handle_right, is_curve, rows):
+    """Lengths of the segments starting at rows. Segments touching a curve
+    point are sampled as Bezier curves, the rest are straight."""
+    co = np.asarray(co, dtype=np.float64)
+    lengths = np.empty(len(rows))
+    if not len(rows):
+        return lengths
+    following = (rows + 1) % len(co)
+    lengths[:] = np.linalg.norm(co[following] - co[rows], axis=1)
+
+    curved = np.flatnonzero(is_curve[rows] | is_curve[following])
+    t = np.linspace(0.0, 1.0, BEZIER_SAMPLES + 1)
+    handle_left = np.asarray(handle_left, dtype=np.float64)
+    handle_right = np.asarray(handle_right, dtype=np.float64)
+    for start in range(0, len(curved), SAMPLE_BLOCK_SIZE):
+        block = curved[start:start + SAMPLE_BLOCK_SIZE]
+        samples = bezier_points(*segment_controls(co, handle_left, handle_right, rows[block]), t)
+        lengths[block] = np.linalg.norm(np.diff(samples, axis=1), axis=2).sum(axis=1)
+    return lengths
+
+
+class ChainageTable:
+    """Cumulative length along one track. chainage[i] is the distance from
+    point 0 to point i, chainage[-1] the length of the whole loop."""
+
+    def __init__(self):
+        self.co = None
+        self.handle_left = None
+        self.handle_right = None
+        self.is_curve = None
+        self.lengths = np.empty(0)
+        self.chainage = np.zeros(1)
+
+    @property
+    def length(self):
+        return float(self.chainage[-1])
+
+    def sync(self, co, handle_left, handle_right, flags):
+        """Bring the table in line with the track. Only segments next to a
+        changed point are measured again. Returns the number re-measured."""
+        is_curve = (np.asarray(flags, dtype=np.int64) & 1).astype(bool)
+        count = len(co)
+        if self.co is None or len(self.co) != count:
+            rows = np.arange(count)
+        else:
+            changed = ((self.co != co).any(axis=1) | (self.handle_left != handle_left).any(axis=1)
+                       | (self.handle_right != handle_right).any(axis=1) | (self.is_curve != is_curve))
+            points = np.flatnonzero(changed)
+            if not len(points):
+                return 0
+            # A point shapes the segment it starts and the one that ends on it
+            rows = np.unique(np.concatenate((points, (points - 1) % count)))
+
+        self.co = np.array(co, dtype=np.float32)
+        self.handle_left = np.array(handle_left, dtype=np.float32)
+        self.handle_right = np.array(handle_right, dtype=np.float32)
+        self.is_curve = is_curve
+        if len(self.lengths) != count:
+            self.lengths = np.empty(count)
+        self.lengths[rows] = segment_lengths(self.co, self.handle_left, self.handle_right, is_curve, rows)
+        self.chainage = np.concatenate(([0.0], np.cumsum(self.lengths)))
+        return len(rows)
+
+    def distance_of(self, row):
+        return float(self.chainage[row])
+
+    def distance_between(self, row_a, row_b):
+        """Distance travelled from row_a forward to row_b, wrapping around the loop."""
+        return (self.chainage[row_b] - self.chainage[row_a]) % self.length if self.length else 0.0
+
+    def position_at(self, distance):
+        """(position, segment row) at distance along the track, wrapping around the loop."""
+        count = len(self.lengths)
+        if not count:
+            raise ValueError("track has no points")
+        if self.length:
+            distance %= self.length
+        row = min(int(np.searchsorted(self.chainage, distance, side='right')) - 1, count - 1)
+        remaining = distance - self.chainage[row]
+        segment_length = self.lengths[row]
+        fraction = remaining / segment_length if segment_length else 0.0
+
+        rows = np.array([row])
+        p0, p1, p2, p3 = (np.asarray(part, dtype=np.float64) for part in segment_controls(self.co, self.handle_left, self.handle_right, rows))
+        if not (self.is_curve[row] or self.is_curve[(row + 1) % count]):
+            return p0[0] + (p3[0] - p0[0]) * fraction, row
+
+        # Walk the same chords the length came from and interpolate inside one
+        samples = bezier_points(p0, p1, p2, p3, np.linspace(0.0, 1.0, BEZIER_SAMPLES + 1))[0]
+        chords = np.linalg.norm(np.diff(samples, axis=0), axis=1)
+        walked = np.concatenate(([0.0], np.cumsum(chords)))
+        chord = min(int(np.searchsorted(walked, remaining, side='right')) - 1, BEZIER_SAMPLES - 1)
+        chord_fraction = (remaining - walked[chord]) / chords[chord] if chords[chord] else 0.0
+        return samples[chord] + (samples[chord + 1] - samples[chord]) * chord_fraction, row
@@ -0,0 +1,162 @@
+"""Command line .dat toolkit, runs without Blender.
+
+    python track_cli.py validate track1.dat track2.dat
+    python track_cli.py normalize track1.dat -o track1.norm.dat
+    python track_cli.py roundtrip tracks/
+    python track_cli.py convert tracks/ --out-dir normalized/
+
+"normalize" writes what an import followed by an export from Blender would
+produce: float32 coordinates, recomputed distances and header counts.
+"""
+import argparse
+import glob
+import os
+import sys
+
+try:
+    from . import track_core
+except ImportError:
+    import track_core
+
+
+def expand_paths(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(glob.glob(os.path.join(path, "*.dat")))
+        else:
+            yield path
+
+
+def read_track(path):
+    with open(path, 'r') as file:
+        header = next(file, "")
+        total_points, curve_points, track_type = track_core.parse_header(header)
+        arrays = track_core.parse_track_lines(file, track_core.preallocate(total_points, file))
+    arrays.trim()
+    return (total_points, curve_points, track_type), arrays
+
+
+def validate_track(path):
+    problems = []
+    (total_points, curve_points, _), arrays = read_track(path)
+    if arrays.count == 0:
+        problems.append("no points")
+    if total_points != arrays.count:
+        problems.append(f"header says {total_points} points, file has {arrays.count}")
+    actual_curve_points = int(arrays.is_curve.sum())
+    if curve_points != actual_curve_points:
+        problems.append(f"header says {curve_points} curve points, file has {actual_curve_points}")
+    return arrays, problems
+
+
+def command_validate(args):
+    failed = 0
+    for path in expand_paths(args.paths):
+        try:
+            arrays, problems = validate_track(path)
+        except (OSError, ValueError) as e:
+            arrays, problems = None, [str(e)]
+        if problems:
+            failed += 1
+            for problem in problems:
+                print(f"{path}: {problem}")
+        elif not args.quiet:
+            print(f"{path}: OK ({arrays.count} points)")
+    return 1 if failed else 0
+
+
+def command_normalize(args):
+    try:
+        (_, _, track_type), arrays = read_track(args.path)
+        text = track_core.format_track_file(track_type, arrays)
+        if args.output:
+            with open(args.output, 'w') as file:
+                file.write(text)
+    except (OSError, ValueError) as e:
+        print(f"{args.path}: {e}")
+        return 1
+    if not args.output:
+        sys.stdout.write(text)
+    return 0
+
+
+def command_roundtrip(args):
+    failed = 0
+    for path in expand_paths(args.paths):
+        try:
+            with open(path, 'r') as file:
+                original = file.read()
+            (_, _, track_type), arrays = read_track(path)
+            first = track_core.format_track_file(track_type, arrays)
+            second_type, second_arrays = track_core.parse_track_file(iter(first.splitlines(True)))
+            second = track_core.format_track_file(second_type, second_arrays)
+        except (OSError, ValueError) as e:
+            failed += 1
+            print(f"{path}: {e}")
+            continue
+
+        if first != second:
+            failed += 1
+            print(f"{path}: not stable, normalizing twice gives different output")
+            continue
+
+        original_lines = original.splitlines()
+        first_lines = first.splitlines()
+        changed = sum(1 for a, b in zip(original_lines, first_lines) if a != b) + abs(len(original_lines) - len(first_lines))
+        if changed:
+            if args.strict:
+                failed += 1
+            print(f"{path}: stable, {changed} line(s) differ from the original")
+        elif not args.quiet:
+            print(f"{path}: identical")
+    return 1 if failed else 0
+
+
+def command_convert(args):
+    os.makedirs(args.out_dir, exist_ok=True)
+    failed = 0
+    for path in expand_paths(args.paths):
+        out_path = os.path.join(args.out_dir, os.path.basename(path))
+        try:
+            (_, _, track_type), arrays = read_track(path)
+            with open(out_path, 'w') as file:
+                file.write(track_core.format_track_file(track_type, arrays))
+        except (OSError, ValueError) as e:
+            failed += 1
+            print(f"{path}: {e}")
+            continue
+        if not args.quiet:
+            print(f"{path} -> {out_path} ({arrays.count} points)")
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate and convert TRAIN TOOLS .dat track files")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print problems")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    validate = commands.add_parser("validate", help="Parse files and check the header counts")
+    validate.add_argument("paths", nargs="+", help=".dat files or directories")
+    validate.set_defaults(func=command_validate)
+
+    normalize = commands.add_parser("normalize", help="Rewrite one file in canonical export form")
+    normalize.add_argument("path")
+    normalize.add_argument("-o", "--output", help="Output file, stdout if omitted")
+    normalize.set_defaults(func=command_normalize)
+
+    roundtrip = commands.add_parser("roundtrip", help="Check that parse -> format is stable and matches the input")
+    roundtrip.add_argument("paths", nargs="+", help=".dat files or directories")
+    roundtrip.add_argument("--strict", action="store_true", help="Fail when the output differs from the input")
+    roundtrip.set_defaults(func=command_roundtrip)
+
+    convert = commands.add_parser("convert", help="Normalize many files into a directory")
+    convert.add_argument("paths", nargs="+", help=".dat files or directories")
+    convert.add_argument("--out-dir", required=True)
+    convert.set_defaults(func=command_convert)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,468 @@
+"""Track .dat parsing, flag encoding, probe hashing and formatting.
+
+Has no bpy dependency so it can run outside Blender, see track_cli.py.
+"""
+import math
+import os
+import time
+import numpy as np
+
+
+def rot(x, k):
+    return ((x << k) & 0xFFFFFFFF) | (x >> (32 - k))
+
+def mix(a, b, c):
+    a = (a - c) & 0xFFFFFFFF; a ^= rot(c, 4); c = (c + b) & 0xFFFFFFFF
+    b = (b - a) & 0xFFFFFFFF; b ^= rot(a, 6); a = (a + c) & 0xFFFFFFFF
+    c = (c - b) & 0xFFFFFFFF; c ^= rot(b, 8); b = (b + a) & 0xFFFFFFFF
+    a = (a - c) & 0xFFFFFFFF; a ^= rot(c, 16); c = (c + b) & 0xFFFFFFFF
+    b = (b - a) & 0xFFFFFFFF; b ^= rot(a, 19); a = (a + c) & 0xFFFFFFFF
+    c = (c - b) & 0xFFFFFFFF; c ^= rot(b, 4); b = (b + a) & 0xFFFFFFFF
+    return a, b, c
+
+def final(a, b, c):
+    c ^= b; c = (c - rot(b, 14)) & 0xFFFFFFFF
+    a ^= c; a = (a - rot(c, 11)) & 0xFFFFFFFF
+    b ^= a; b = (b - rot(a, 25)) & 0xFFFFFFFF
+    c ^= b; c = (c - rot(b, 16)) & 0xFFFFFFFF
+    a ^= c; a = (a - rot(c, 4)) & 0xFFFFFFFF
+    b ^= a; b = (b - rot(a, 14)) & 0xFFFFFFFF
+    c ^= b; c = (c - rot(b, 24)) & 0xFFFFFFFF
+    return a, b, c
+
+def compute_probe_hash(k, initval = 0):
+    length = len(k)
+    a = b = c = (0xdeadbeef + (length << 2) + initval) & 0xFFFFFFFF
+
+    while length > 3:
+        a = (a + k[0]) & 0xFFFFFFFF
+        b = (b + k[1]) & 0xFFFFFFFF
+        c = (c + k[2]) & 0xFFFFFFFF
+        a, b, c = mix(a, b, c)
+        length -= 3
+        k = k[3:]
+
+    if length == 3:
+        c = (c + k[2]) & 0xFFFFFFFF
+    if length >= 2:
+        b = (b + k[1]) & 0xFFFFFFFF
+    if length >= 1:
+        a = (a + k[0]) & 0xFFFFFFFF
+        a, b, c = final(a, b, c)
+
+    return str(c)
+
+def rot_array(x, k):
+    return (x << np.uint32(k)) | (x >> np.uint32(32 - k))
+
+def final_array(a, b, c):
+    c ^= b; c -= rot_array(b, 14)
+    a ^= c; a -= rot_array(c, 11)
+    b ^= a; b -= rot_array(a, 25)
+    c ^= b; c -= rot_array(b, 16)
+    a ^= c; a -= rot_array(c, 4)
+    b ^= a; b -= rot_array(a, 14)
+    c ^= b; c -= rot_array(b, 24)
+    return a, b, c
+
+def quantize_positions(co):
+    """Quantize an (N, 3) array of positions the same way as int(co * 100.0) & 0xFFFFFFFF."""
+    return (np.asarray(co, dtype=np.float64) * 100.0).astype(np.int64) & 0xFFFFFFFF
+
+def compute_probe_hashes(keys, initval = 0):
+    """Batched compute_probe_hash for an (N, 3) array of quantized keys. Returns N uint32 hashes."""
+    keys = (np.asarray(keys, dtype=np.int64) & 0xFFFFFFFF).astype(np.uint32)
+    init = np.uint32((0xdeadbeef + (3 << 2) + initval) & 0xFFFFFFFF)
+    a = keys[:, 0] + init
+    b = keys[:, 1] + init
+    c = keys[:, 2] + init
+    a, b, c = final_array(a, b, c)
+    return c
+
+
+
+class ParsedData:
+    def __init__(self, position, handle_a, handle_b, is_curve, is_station,is_left_station,is_right_station, station_name, is_junction, is_tunnel, is_unk):
+        self.position = position
+        self.handle_a = handle_a
+        self.handle_b = handle_b
+        self.is_curve = is_curve
+        self.is_station = is_station
+        self.is_left_station = is_left_station
+        self.is_right_station = is_right_station
+        self.station_name = station_name
+        self.is_junction = is_junction
+        self.is_tunnel = is_tunnel
+        self.is_unk = is_unk
+
+
+    def get_combined_flags(self):
+        flags = 0
+        flags |= (1 << 0) if self.is_curve else 0  # Bit 0
+        flags |= (1 << 1) if self.is_station else 0  # Bit 1
+        flags |= (1 << 2) if self.is_left_station else 0  # Bit 1
+        flags |= (1 << 3) if self.is_right_station else 0  # Bit 1
+        flags |= (1 << 4) if self.is_junction else 0  # Bit 2
+        flags |= (1 << 5) if self.is_tunnel else 0  # Bit 3
+        flags |= (1 << 6) if self.is_unk else 0  # Bit 4
+        
+        return flags
+    
+    def decode_flags(combined_flags):
+        combined_flags = int(combined_flags)
+        is_curve = bool(combined_flags & (1 << 0))  # Check Bit 0
+        is_station = bool(combined_flags & (1 << 1))  # Check Bit 1
+        is_left_station = bool(combined_flags & (1 << 2))  # Check Bit 1
+        is_right_station = bool(combined_flags & (1 << 3))  # Check Bit 1
+        is_junction = bool(combined_flags & (1 << 4))  # Check Bit 2
+        is_tunnel = bool(combined_flags & (1 << 5))  # Check Bit 3
+        is_unk = bool(combined_flags & (1 << 6))  # Check Bit 4
+
+        return {
+            'is_curve': is_curve,
+            'is_station': is_station,
+            'is_left_station': is_left_station,
+            'is_right_station': is_right_station,
+            'is_junction': is_junction,
+            'is_tunnel': is_tunnel,
+            'is_unk': is_unk
+        }
+
+    def __repr__(self):
+        return (f"Position: {self.position}, Handle A: {self.handle_a}, Handle B: {self.handle_b}, "
+                f"Is Curve: {self.is_curve}, Is Station: {self.is_station}, "
+                f"Is Junction: {self.is_junction}, Is Tunnel: {self.is_tunnel}, Is Unk: {self.is_unk}")
+
+def parse_line(line):
+    tokens = line.split()
+    if tokens[0] == 'c':
+        is_curve = True
+        position = (float(tokens[1]), float(tokens[2]), float(tokens[3]))
+        handle_a = (float(tokens[4]), float(tokens[5]), float(tokens[6]))
+        handle_b = (float(tokens[7]), float(tokens[8]), float(tokens[9]))
+        
+        # position = (position[0], position[2], position[1])
+        # handle_a = (handle_a[0], handle_a[2], handle_a[1])
+        # handle_b = (handle_b[0], handle_b[2], handle_b[1])
+
+        is_station = tokens[11] == "1"
+        is_left_station = tokens[11] == "2"
+        is_right_station = tokens[11] == "6"
+        is_junction = tokens[11] == "8"
+        is_tunnel = tokens[11] == "4"
+        is_unk = tokens[11] == "32"
+
+        name = tokens[12] if is_station or is_left_station or is_right_station or is_junction else None
+    else:
+        is_curve = False
+        position = (float(tokens[0]), float(tokens[1]), float(tokens[2]))
+        
+        # position = (position[0], position[1], position[2])
+        handle_a = position
+        handle_b = position
+
+        is_station = tokens[4] == "1"
+        is_left_station = tokens[4] == "2"
+        is_right_station = tokens[4] == "6"
+        is_junction = tokens[4] == "8"
+        is_tunnel = tokens[4] == "4"
+        is_unk = tokens[4] == "32"
+        
+        name = tokens[5] if is_station or is_left_station or is_right_station or is_junction else None
+    
+    return ParsedData(position, handle_a, handle_b, is_curve, is_station, is_left_station, is_right_station, name, is_junction, is_tunnel, is_unk)
+
+# Flag token -> radius bit, same mapping as parse_line
+FLAG_TOKEN_BITS = {"1": 1 << 1, "2": 1 << 2, "6": 1 << 3, "8": 1 << 4, "4": 1 << 5, "32": 1 << 6}
+NODE_FLAG_MASK = (1 << 1) | (1 << 2) | (1 << 3) | (1 << 4)
+# Every token bit, a point exports one token so setting one clears the others
+FLAG_TOKEN_MASK = sum(FLAG_TOKEN_BITS.values())
+PARSE_BLOCK_SIZE = 4096
+
+class TrackArrays:
+    # Columnar replacement for a list of ParsedData. Per point this holds
+    # 3 x 12 bytes of float32 coordinates, a uint8 flag and a bool curve mask
+    # (38 bytes) plus one dict entry per station/junction.
+    # Measured with tracemalloc on a 100k point track (CPython 3.11, ~6%
+    # stations/junctions): ~46 bytes per point retained, ~59 at peak, against
+    # ~397 bytes per point for the list of ParsedData it replaces.
+    def __init__(self, capacity=0):
+        self.count = 0
+        self.position = np.empty((capacity, 3), dtype=np.float32)
+        self.handle_a = np.empty((capacity, 3), dtype=np.float32)
+        self.handle_b = np.empty((capacity, 3), dtype=np.float32)
+        self.flags = np.zeros(capacity, dtype=np.uint8)
+        self.is_curve = np.zeros(capacity, dtype=bool)
+        self.station_names = {}
+
+    def reserve(self, capacity):
+        if capacity <= len(self.flags):
+            return
+        capacity = max(capacity, 2 * len(self.flags))
+        for name in self.COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def trim(self):
+        if self.count == len(self.flags):
+            return
+        for name in self.COLUMNS:
+            setattr(self, name, getattr(self, name)[:self.count].copy())
+
+    def append_rows(self, coords, flags, names):
+        rows = len(flags)
+        start = self.count
+        end = start + rows
+        self.reserve(end)
+        block = np.array(coords, dtype=np.float64).reshape(rows, 3, 3)
+        self.position[start:end] = block[:, 0]
+        self.handle_a[start:end] = block[:, 1]
+        self.handle_b[start:end] = block[:, 2]
+        self.flags[start:end] = flags
+        self.is_curve[start:end] = self.flags[start:end] & 1
+        for row, name in names.items():
+            self.station_names[start + row] = name
+        self.count = end
+
+    COLUMNS = ("position", "handle_a", "handle_b", "flags", "is_curve")
+
+    @classmethod
+    def from_columns(cls, columns, station_names):
+        arrays = cls()
+        for name in cls.COLUMNS:
+            setattr(arrays, name, columns[name])
+        arrays.station_names = dict(station_names)
+        arrays.count = len(arrays.flags)
+        return arrays
+
+    def node_rows(self):
+        return sorted(self.station_names)
+
+    def take(self, rows):
+        """New TrackArrays holding rows, station names renumbered to match."""
+        rows = np.asarray(rows, dtype=np.int64)
+        names = {new_row: self.station_names[row] for new_row, row in enumerate(rows.tolist()) if row in self.station_names}
+        return TrackArrays.from_columns({name: getattr(self, name)[:self.count][rows] for name in self.COLUMNS}, names)
+
+def chunk_rows(count, chunk_size):
+    """Rows of each chunk of a chunk_size split. Every chunk also repeats the
+    first row of the next one (the last repeats row 0) so the chunks join up
+    on screen. Stitching keeps one copy of each, main.read_track_arrays
+    writes an edited copy back over the other first."""
+    return [np.append(np.arange(start, min(start + chunk_size, count)), min(start + chunk_size, count) % count)
+            for start in range(0, count, chunk_size)]
+
+class TrackFormatError(ValueError):
+    def __init__(self, line_number, message):
+        super().__init__(f"line {line_number}: {message}")
+        self.line_number = line_number
+
+def parse_header(line):
+    try:
+        tokens = line.split()
+        total_points, curve_points = int(tokens[0]), int(tokens[1])
+        track_type = tokens[2]
+    except (IndexError, ValueError) as e:
+        raise TrackFormatError(1, f"invalid header {line.strip()!r}") from e
+    if total_points < 0 or curve_points < 0:
+        raise TrackFormatError(1, f"invalid header {line.strip()!r}")
+    return total_points, curve_points, track_type
+
+# Shortest possible point line, "0 0 0 0 0\n"
+MIN_LINE_BYTES = 10
+# Preallocation cap when the file size is unknown, arrays grow past it as needed
+MAX_PREALLOCATED_POINTS = 1 << 20
+
+def file_point_limit(file):
+    """Most point lines the rest of file can hold, going by its size."""
+    try:
+        return os.fstat(file.fileno()).st_size // MIN_LINE_BYTES + 1
+    except (AttributeError, OSError, ValueError):
+        return MAX_PREALLOCATED_POINTS
+
+def preallocate(total_points, file):
+    # The header count is only trusted as far as the file could back it, a
+    # corrupt header must not turn into a huge allocation
+    return TrackArrays(min(total_points, file_point_limit(file)))
+
+def parse_track_lines(lines, arrays, first_line=2):
+    coords = []
+    flags = []
+    names = {}
+    for line_number, line in enumerate(lines, first_line):
+        tokens = line.split()
+        if not tokens:
+            continue
+        try:
+            if tokens[0] == 'c':
+                values = [float(token) for token in tokens[1:10]]
+                if len(values) != 9:
+                    raise IndexError
+                flag_text = tokens[11]
+                bits = 1
+                name_index = 12
+            else:
+                position = [float(tokens[0]), float(tokens[1]), float(tokens[2])]
+                values = position * 3
+                flag_text = tokens[4]
+                bits = 0
+                name_index = 5
+            bits |= FLAG_TOKEN_BITS.get(flag_text, 0)
+            name = tokens[name_index] if bits & NODE_FLAG_MASK else None
+        except (IndexError, ValueError) as e:
+            raise TrackFormatError(line_number, f"cannot parse {line.strip()!r}") from e
+
+        coords.extend(values)
+        if name is not None:
+            names[len(flags)] = name
+        flags.append(bits)
+
+        if len(flags) == PARSE_BLOCK_SIZE:
+            arrays.append_rows(coords, flags, names)
+            coords = []
+            flags = []
+            names = {}
+    if flags:
+        arrays.append_rows(coords, flags, names)
+    return arrays
+
+def parse_track_file(file):
+    total_points, curve_points, track_type = parse_header(next(file, ""))
+    arrays = parse_track_lines(file, preallocate(total_points, file))
+    arrays.trim()
+    return track_type, arrays
+
+def read_track_file(path):
+    with open(path, 'r') as file:
+        return parse_track_file(file)
+
+def node_label(combined_flags):
+    flags = ParsedData.decode_flags(combined_flags)
+    return 'STATION' if flags['is_station'] else 'LEFT STATION' if flags['is_left_station'] else 'RIGHT STATION' if flags['is_right_station'] else 'JUNCTION' if flags['is_junction'] else 'UNKNOWN'
+
+def distance(p1, p2):
+    dx = p1[0] - p2[0]
+    dy = p1[1] - p2[1]
+    dz = p1[2] - p2[2]
+    return math.sqrt(dx * dx + dy * dy + dz * dz)
+
+def export_to_text(point, distance, node_name):
+        flags = ParsedData.decode_flags(point.radius)
+
+        if flags["is_curve"]:
+            pos = f"{point.co[0]:.4f} {point.co[1]:.4f} {point.co[2]:.4f}"
+            handle_a = f"{point.handle_left[0]:.4f} {point.handle_left[1]:.4f} {point.handle_left[2]:.4f}"
+            handle_b = f"{point.handle_right[0]:.4f} {point.handle_right[1]:.4f} {point.handle_right[2]:.4f}"
+            flag = "0"
+            station_text = ""
+            if flags["is_station"]:
+                flag = "1" 
+                station_text = node_name
+            elif flags["is_left_station"]:
+                flag = "2" 
+                station_text = node_name
+            elif flags["is_right_station"]:
+                flag = "6" 
+                station_text = node_name
+            elif flags["is_junction"]:
+                flag = "8" 
+                station_text = node_name
+            elif flags["is_tunnel"]:
+                flag = "4" 
+            elif flags["is_unk"]:
+                flag = "32" 
+            return f"c {pos} {handle_a} {handle_b} {distance:.4f} {flag} {station_text}"
+        else:
+            pos = f"{point.co[0]:.4f} {point.co[1]:.4f} {point.co[2]:.4f}"
+            flag = "0"
+            station_text = ""
+            if flags["is_station"]:
+                flag = "1" 
+                station_text = node_name
+            elif flags["is_left_station"]:
+                flag = "2" 
+                station_text = node_name
+            elif flags["is_right_station"]:
+                flag = "6" 
+                station_text = node_name
+            elif flags["is_junction"]:
+                flag = "8" 
+                station_text = node_name
+            elif flags["is_tunnel"]:
+                flag = "4" 
+            elif flags["is_unk"]:
+                flag = "32" 
+                
+            return f"{pos} {distance:.4f} {flag} {station_text}"
+
+
+
+def flag_token(combined_flags):
+    flags = ParsedData.decode_flags(combined_flags)
+    if flags["is_station"]:
+        return "1", True
+    elif flags["is_left_station"]:
+        return "2", True
+    elif flags["is_right_station"]:
+        return "6", True
+    elif flags["is_junction"]:
+        return "8", True
+    elif flags["is_tunnel"]:
+        return "4", False
+    elif flags["is_unk"]:
+        return "32", False
+    return "0", False
+
+# Lookup tables over the 7 flag bits, same priority as export_to_text
+FLAG_TOKENS = np.array([flag_token(flags)[0] for flags in range(128)], dtype=object)
+FLAG_HAS_NAME = np.array([flag_token(flags)[1] for flags in range(128)], dtype=bool)
+
+def segment_distances(co):
+    # Same operation order as distance() so the doubles match bit for bit
+    co = co.astype(np.float64)
+    delta = co - np.roll(co, -1, axis=0)
+    dx = delta[:, 0]
+    dy = delta[:, 1]
+    dz = delta[:, 2]
+    return np.sqrt(dx * dx + dy * dy + dz * dz)
+
+def resolve_node_names(co, radius, node_index):
+    rows = np.flatnonzero(FLAG_HAS_NAME[radius.astype(np.int64) & 0x7F])
+    hashes = compute_probe_hashes(quantize_positions(co[rows]))
+    node_names = {}
+    matched_ids = set()
+    for i, hash_value in zip(rows.tolist(), hashes.tolist()):
+        index = str(hash_value)
+        if index in node_index:
+            node_names[i] = node_index[index]
+            matched_ids.add(index)
+    return node_names, matched_ids
+
+def format_track_lines(co, handle_left, handle_right, radius, node_names):
+    flags = radius.astype(np.int64) & 0x7F
+    tokens = FLAG_TOKENS[flags]
+    is_curve = (flags & 1).astype(bool)
+    distances = segment_distances(co)
+
+    lines = []
+    for i, (position, handle_a, handle_b, dist, token, curve) in enumerate(zip(co.tolist(), handle_left.tolist(), handle_right.tolist(), distances.tolist(), tokens.tolist(), is_curve.tolist())):
+        station_text = node_names.get(i, "")
+        if curve:
+            lines.append("c %.4f %.4f %.4f %.4f %.4f %.4f %.4f %.4f %.4f %.4f %s %s" % (*position, *handle_a, *handle_b, dist, token, station_text))
+        else:
+            lines.append("%.4f %.4f %.4f %.4f %s %s" % (*position, dist, token, station_text))
+    return lines
+
+def format_track_file(track_type, arrays):
+    header = f"{arrays.count} {int(np.count_nonzero(arrays.is_curve))} {track_type}"
+    lines = format_track_lines(arrays.position, arrays.handle_a, arrays.handle_b, arrays.flags, arrays.station_names)
+    return "\n".join([header] + lines) + "\n"
+
+def write_track_arrays(path, header, co, handle_left, handle_right, radius, node_names):
+    start_time = time.perf_counter()
+    lines = format_track_lines(co, handle_left, handle_right, radius, node_names)
+    with open(path, 'w') as file:
+        file.write("\n".join([header] + lines) + "\n")
+    return len(lines), time.perf_counter() - start_time
@@ -0,0 +1,60 @@
+import numpy as np
+
+
+def protected_points(flags):
+    """Points decimation must keep: any flagged point, the points either side
+    of a curve point (they shape its Bezier segments) and both ends."""
+    flags = np.asarray(flags, dtype=np.int64) & 0x7F
+    keep = flags != 0
+    is_curve = (flags & 1).astype(bool)
+    keep[:-1] |= is_curve[1:]
+    keep[1:] |= is_curve[:-1]
+    if len(keep):
+        keep[0] = keep[-1] = True
+    return keep
+
+
+def segment_distances(co, points, starts, ends):
+    # Distance of each point to the segment between its start and end anchor
+    a = co[starts]
+    ab = co[ends] - a
+    ap = co[points] - a
+    length_squared = np.einsum('ij,ij->i', ab, ab)
+    t = np.divide(np.einsum('ij,ij->i', ap, ab), length_squared, out=np.zeros(len(points)), where=length_squared > 0)
+    t = np.clip(t, 0.0, 1.0)
+    return np.linalg.norm(ap - ab * t[:, None], axis=1)
+
+
+def decimate(co, flags, tolerance):
+    """Douglas-Peucker over every span between protected points at once.
+    Returns a mask of the points to keep."""
+    co = np.asarray(co, dtype=np.float64)
+    keep = protected_points(flags)
+    if len(co) < 3:
+        keep[:] = True
+        return keep
+
+    # Each pass splits every open span at its farthest point, spans whose
+    # farthest point is within tolerance are closed and their points dropped
+    candidates = np.flatnonzero(~keep)
+    while len(candidates):
+        anchors = np.flatnonzero(keep)
+        span = np.searchsorted(anchors, candidates) - 1
+        distances = segment_distances(co, candidates, anchors[span], anchors[span + 1])
+
+        # Farthest candidate of each span: sort by span, then distance
+        order = np.lexsort((-distances, span))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = span[order][1:] != span[order][:-1]
+        farthest = order[first]
+        split = farthest[distances[farthest] > tolerance]
+        if not len(split):
+            break
+        keep[candidates[split]] = True
+
+        open_spans = np.zeros(len(anchors), dtype=bool)
+        open_spans[span[split]] = True
+        remaining = open_spans[span]
+        remaining[split] = False
+        candidates = candidates[remaining]
+    return keep
@@ -0,0 +1,219 @@
+import heapq
+
+import numpy as np
+
+try:
+    from .track_core import FLAG_TOKENS, segment_distances
+except ImportError:
+    import track_core
+    FLAG_TOKENS, segment_distances = track_core.FLAG_TOKENS, track_core.segment_distances
+
+# Same priority as export, a point written as token 8 is a junction and the
+# other named tokens are stations
+IS_JUNCTION = FLAG_TOKENS == "8"
+IS_STATION = np.isin(FLAG_TOKENS, ["1", "2", "6"])
+
+DEFAULT_TOLERANCE = 1.0
+
+
+class TrackTopology:
+    """What the graph keeps of one track: chainage for edge weights and the
+    junction and station rows. grid is the spatial index entry it came from."""
+
+    def __init__(self, grid, flags, node_names):
+        self.grid = grid
+        self.node_names = node_names
+        points = grid.points
+        self.count = len(points)
+        # Tracks are loops, the last point runs back to the first
+        segments = segment_distances(points) if self.count else np.empty(0)
+        self.chainage = np.concatenate(([0.0], np.cumsum(segments)))
+        self.junction_rows = np.flatnonzero(IS_JUNCTION[flags])
+        self.station_rows = np.flatnonzero(IS_STATION[flags])
+        self.station_names = {row: node_names[row] for row in self.station_rows.tolist() if row in node_names}
+
+    @property
+    def length(self):
+        return float(self.chainage[-1])
+
+
+class JunctionGraph:
+    """Stations and junctions of every track as one graph.
+
+    Vertices are (track key, row). Along a track consecutive vertices are
+    joined by their chainage difference. A junction is joined at zero cost to
+    the nearest point of every other track within tolerance. A spatial hash
+    of which tracks occupy which grid cell limits that search to the tracks
+    near each junction, and re-syncing one track only re-matches the
+    junctions that touch it.
+    """
+
+    def __init__(self, tolerance=DEFAULT_TOLERANCE):
+        self.tolerance = tolerance
+        self.tracks = {}
+        # (key, row) -> {(other key, other row)}, symmetric
+        self.links = {}
+        # Cell of the tracks' grids -> keys of the tracks with points in it
+        self.cells = {}
+        self.cell_size = None
+        self.adjacency = None
+
+    def sync(self, index, node_names):
+        """Bring the graph in line with a TrackSpatialIndex. node_names maps
+        track key -> {row: name}. Returns the keys that were re-matched."""
+        changed = set()
+        for key in list(self.tracks):
+            if key not in index.grids:
+                self.remove_track(key)
+                changed.add(key)
+        for key, grid in index.grids.items():
+            names = node_names.get(key, {})
+            topology = self.tracks.get(key)
+            if topology is not None and topology.grid is grid and topology.node_names == names:
+                continue
+            flags = index.flags[key]
+            if flags is None:
+                flags = np.zeros(len(grid), dtype=np.int64)
+            self.remove_track(key)
+            self.add_track(key, TrackTopology(grid, flags, names))
+            changed.add(key)
+        if changed:
+            self.relink(changed)
+            self.adjacency = None
+        return changed
+
+    def set_tolerance(self, tolerance):
+        if tolerance == self.tolerance:
+            return
+        self.tolerance = tolerance
+        self.links.clear()
+        self.relink(set(self.tracks))
+        self.adjacency = None
+
+    def add_track(self, key, topology):
+        grid = topology.grid
+        self.cell_size = grid.cell_size
+        cells = np.stack(np.unravel_index(grid.cell_keys, tuple(grid.shape)), axis=1) + grid.lower
+        topology.cells = list(map(tuple, cells.tolist()))
+        for cell in topology.cells:
+            self.cells.setdefault(cell, set()).add(key)
+        self.tracks[key] = topology
+
+    def remove_track(self, key):
+        topology = self.tracks.pop(key, None)
+        if topology is None:
+            return
+        for cell in topology.cells:
+            keys = self.cells[cell]
+            keys.discard(key)
+            if not keys:
+                del self.cells[cell]
+        for vertex in [vertex for vertex in self.links if vertex[0] == key]:
+            for other in self.links.pop(vertex):
+                peers = self.links.get(other)
+                if peers is not None:
+                    peers.discard(vertex)
+                    if not peers:
+                        del self.links[other]
+
+    def add_link(self, a, b):
+        self.links.setdefault(a, set()).add(b)
+        self.links.setdefault(b, set()).add(a)
+
+    def tracks_near(self, point, offsets):
+        centre = np.floor(point / self.cell_size).astype(np.int64).tolist()
+        keys = set()
+        for dx, dy, dz in offsets:
+            keys.update(self.cells.get((centre[0] + dx, centre[1] + dy, centre[2] + dz), ()))
+        return keys
+
+    def relink(self, changed):
+        # Links touching changed tracks were dropped with them. Re-match every
+        # junction of a changed track, and every other junction that has a
+        # changed track in its neighbourhood
+        if self.cell_size is None:
+            return
+        span = int(np.ceil(self.tolerance / self.cell_size))
+        offsets = [(dx, dy, dz) for dx in range(-span, span + 1)
+                   for dy in range(-span, span + 1) for dz in range(-span, span + 1)]
+        for key, topology in self.tracks.items():
+            points = topology.grid.points
+            for row in topology.junction_rows.tolist():
+                near = self.tracks_near(points[row], offsets)
+                near.discard(key)
+                if key not in changed:
+                    near &= changed
+                for other_key in near:
+                    rows, _ = self.tracks[other_key].grid.query_nearest(points[row], 1, self.tolerance)
+                    if len(rows):
+                        self.add_link((key, row), (other_key, int(rows[0])))
+
+    def build_adjacency(self):
+        adjacency = {}
+        for key, topology in self.tracks.items():
+            rows = set(topology.junction_rows.tolist()) | set(topology.station_rows.tolist())
+            rows.update(row for vertex_key, row in self.links if vertex_key == key)
+            rows = sorted(rows)
+            for row in rows:
+                adjacency.setdefault((key, row), [])
+            if len(rows) < 2:
+                continue
+            chainage = topology.chainage
+            for a, b in zip(rows, rows[1:] + rows[:1]):
+                weight = chainage[b] - chainage[a] if b > a else topology.length - chainage[a] + chainage[b]
+                adjacency[(key, a)].append(((key, b), float(weight)))
+                adjacency[(key, b)].append(((key, a), float(weight)))
+        for vertex, peers in self.links.items():
+            adjacency.setdefault(vertex, []).extend((peer, 0.0) for peer in peers)
+        self.adjacency = adjacency
+        return adjacency
+
+    def neighbours(self, vertex):
+        adjacency = self.adjacency if self.adjacency is not None else self.build_adjacency()
+        return adjacency.get(vertex, ())
+
+    def find_stations(self, name):
+        """Vertices of every station called name."""
+        return [(key, row) for key, topology in self.tracks.items()
+                for row, station_name in topology.station_names.items() if station_name == name]
+
+    def unlinked_junctions(self):
+        """Junction vertices that reach no other track within tolerance."""
+        return [(key, row) for key, topology in self.tracks.items()
+                for row in topology.junction_rows.tolist() if (key, row) not in self.links]
+
+    def reachable(self, start):
+        """Every vertex connected to start."""
+        seen = {start}
+        stack = [start]
+        while stack:
+            vertex = stack.pop()
+            for peer, _ in self.neighbours(vertex):
+                if peer not in seen:
+                    seen.add(peer)
+                    stack.append(peer)
+        return seen
+
+    def shortest_path(self, start, goals):
+        """(distance, vertices) of the shortest route from start to any of
+        goals, or None when none is reachable."""
+        goals = set(goals)
+        distances = {start: 0.0}
+        previous = {}
+        queue = [(0.0, start)]
+        while queue:
+            distance, vertex = heapq.heappop(queue)
+            if distance > distances[vertex]:
+                continue
+            if vertex in goals:
+                path = [vertex]
+                while path[-1] in previous:
+                    path.append(previous[path[-1]])
+                return distance, path[::-1]
+            for peer, weight in self.neighbours(vertex):
+                candidate = distance + weight
+                if candidate < distances.get(peer, np.inf):
+                    distances[peer] = candidate
+                    previous[peer] = vertex
+                    heapq.heappush(queue, (candidate, peer))
+        return None
@@ -0,0 +1,64 @@
+import bisect
+
+import numpy as np
+
+
+class ListIndex:
+    """Search index over the rows of one UI list. Names and kinds are kept
+    sorted for prefix lookups by binary search, and every filter/sort result
+    is cached until the list changes and the index is rebuilt."""
+
+    def __init__(self, names, kinds, positions=None):
+        self.count = len(names)
+        self.kinds = np.array(kinds, dtype=object)
+        self.positions = None if positions is None else np.asarray(positions)
+        lowered_names = [name.lower() for name in names]
+        self.alpha_order = sorted(range(self.count), key=lowered_names.__getitem__)
+        self.keys = []
+        for values in (lowered_names, [kind.lower() for kind in kinds]):
+            order = sorted(range(self.count), key=values.__getitem__)
+            self.keys.append(([values[i] for i in order], np.array(order, dtype=np.int64)))
+        self.results = {}
+
+    def prefix_rows(self, text):
+        """Rows whose name or kind starts with text."""
+        text = text.lower()
+        hits = []
+        for sorted_values, order in self.keys:
+            low = bisect.bisect_left(sorted_values, text)
+            high = bisect.bisect_left(sorted_values, text + "\uffff", low)
+            hits.append(order[low:high])
+        return np.unique(np.concatenate(hits))
+
+    def filter(self, text, kinds, sort, visible_flag):
+        """(flags, new order) in the form UIList.filter_items returns them.
+        kinds limits rows to those kinds, sort is 'NONE', 'ALPHA' or 'POSITION'."""
+        key = (text, kinds, sort, visible_flag)
+        result = self.results.get(key)
+        if result is not None:
+            return result
+
+        visible = np.ones(self.count, dtype=bool)
+        if text:
+            visible[:] = False
+            visible[self.prefix_rows(text)] = True
+        if kinds:
+            visible &= np.isin(self.kinds, list(kinds))
+        flags = np.where(visible, visible_flag, 0).tolist()
+
+        if sort == 'ALPHA':
+            display = np.array(self.alpha_order, dtype=np.int64)
+        elif sort == 'POSITION' and self.positions is not None:
+            display = np.argsort(self.positions, kind='stable')
+        else:
+            display = None
+        if display is None:
+            new_order = []
+        else:
+            # UIList wants the display position of each row, not the rows in display order
+            new_order = np.empty(self.count, dtype=np.int64)
+            new_order[display] = np.arange(self.count)
+            new_order = new_order.tolist()
+
+        result = self.results[key] = (flags, new_order)
+        return result
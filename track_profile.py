@@ -0,0 +1,204 @@
+import collections
+import contextlib
+import json
+import threading
+import time
+import tracemalloc
+
+# Runs kept for the panel, older ones are only in the JSON log
+HISTORY_SIZE = 20
+
+# report(text) shows log write errors, a handler pass that closes a run has
+# no operator to report through
+settings = {"enabled": False, "trace_memory": False, "log_path": "", "report": None}
+history = collections.deque(maxlen=HISTORY_SIZE)
+active_runs = []
+# The merged run still adding up calls, logged once another run closes it
+log_state = {"open": None}
+
+NULL_CONTEXT = contextlib.nullcontext()
+
+
+class Run:
+    def __init__(self, label):
+        self.label = label
+        self.started = time.time()
+        self.calls = 0
+        self.seconds = 0.0
+        # Stage name -> [calls, seconds], in first-seen order
+        self.stages = {}
+        self.peak_mib = None
+        self.thread = threading.get_ident()
+
+    def add_stage(self, name, seconds):
+        totals = self.stages.get(name)
+        if totals is None:
+            self.stages[name] = [1, seconds]
+        else:
+            totals[0] += 1
+            totals[1] += seconds
+
+    def merge(self, other):
+        self.calls += other.calls
+        self.seconds += other.seconds
+        for name, (calls, seconds) in other.stages.items():
+            totals = self.stages.setdefault(name, [0, 0.0])
+            totals[0] += calls
+            totals[1] += seconds
+        if other.peak_mib is not None:
+            self.peak_mib = max(self.peak_mib or 0.0, other.peak_mib)
+
+    def as_dict(self):
+        return {
+            "label": self.label,
+            "started": self.started,
+            "calls": self.calls,
+            "seconds": self.seconds,
+            "peak_mib": self.peak_mib,
+            "stages": {name: {"calls": calls, "seconds": seconds} for name, (calls, seconds) in self.stages.items()},
+        }
+
+
+class StageTimer:
+    __slots__ = ("run", "name", "start")
+
+    def __init__(self, run, name):
+        self.run = run
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.run.add_stage(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class RunTimer:
+    def __init__(self, label, merge):
+        self.run = Run(label)
+        self.merge = merge
+        self.owns_tracemalloc = False
+
+    def __enter__(self):
+        if settings["trace_memory"] and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.owns_tracemalloc = True
+        active_runs.append(self.run)
+        self.start = time.perf_counter()
+        return self.run
+
+    def __exit__(self, *exc_info):
+        run = self.run
+        run.seconds = time.perf_counter() - self.start
+        run.calls = 1
+        active_runs.pop()
+        if self.owns_tracemalloc:
+            run.peak_mib = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+        record(run, self.merge)
+        return False
+
+
+def configure(enabled=None, trace_memory=None, log_path=None, report=None):
+    if log_path is not None and log_path != settings["log_path"]:
+        flush_log()
+    for key, value in (("enabled", enabled), ("trace_memory", trace_memory), ("log_path", log_path), ("report", report)):
+        if value is not None:
+            settings[key] = value
+
+
+def run(label, merge=False):
+    """Time one operator call or handler pass. With merge, consecutive runs
+    of the same label (modal steps, handler calls) add up into one entry."""
+    if not settings["enabled"]:
+        return NULL_CONTEXT
+    return RunTimer(label, merge)
+
+
+def stage(name):
+    """Time a stage of the innermost run. Costs one list check when off.
+    Stages reached from worker threads are not timed."""
+    if not active_runs or active_runs[-1].thread != threading.get_ident():
+        return NULL_CONTEXT
+    return StageTimer(active_runs[-1], name)
+
+
+def record(run, merge):
+    open_run = log_state["open"]
+    if merge and open_run is not None and open_run.label == run.label and history and history[-1] is open_run:
+        open_run.merge(run)
+        return
+    flush_log()
+    history.append(run)
+    if merge:
+        log_state["open"] = run
+    else:
+        write_log(run)
+
+
+def flush_log():
+    """Write the merged run that is still open, if any."""
+    open_run = log_state["open"]
+    log_state["open"] = None
+    if open_run is not None:
+        write_log(open_run)
+
+
+def write_log(run):
+    if not settings["log_path"]:
+        return
+    try:
+        with open(settings["log_path"], 'a') as file:
+            file.write(json.dumps(run.as_dict()) + "\n")
+    except OSError as e:
+        if settings["report"] is not None:
+            settings["report"](f"TRAIN TOOLS: cannot write profile log: {e}")
+
+
+def clear():
+    flush_log()
+    history.clear()
+
+
+# Blender checks the argument count of registered methods, so each wrapper
+# spells out the signature it replaces
+def wrap_execute(func, label):
+    def execute(self, context):
+        if not settings["enabled"]:
+            return func(self, context)
+        with run(label):
+            return func(self, context)
+    execute.profiled = True
+    return execute
+
+
+def wrap_invoke(func, label):
+    def invoke(self, context, event):
+        if not settings["enabled"]:
+            return func(self, context, event)
+        with run(label + ":invoke"):
+            return func(self, context, event)
+    invoke.profiled = True
+    return invoke
+
+
+def wrap_modal(func, label):
+    def modal(self, context, event):
+        if not settings["enabled"]:
+            return func(self, context, event)
+        with run(label + ":modal", merge=True):
+            return func(self, context, event)
+    modal.profiled = True
+    return modal
+
+
+WRAPPERS = {"execute": wrap_execute, "invoke": wrap_invoke, "modal": wrap_modal}
+
+
+def instrument(cls, label):
+    for name, wrap in WRAPPERS.items():
+        func = getattr(cls, name, None)
+        if func is not None and not getattr(func, "profiled", False):
+            setattr(cls, name, wrap(func, label))
+    return cls
@@ -0,0 +1,146 @@
+import itertools
+
+import numpy as np
+
+# Track points are a few metres apart, so a cell holds a handful of points
+# and radius queries of up to a few cells touch only a small neighbourhood
+DEFAULT_CELL_SIZE = 25.0
+
+
+def expand_ranges(starts, ends):
+    # Concatenated aranges of [start, end) without a Python loop
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(total, dtype=np.int64)
+
+
+class PointGrid:
+    """Uniform grid over one point set. Occupied cells are kept sorted by key
+    so a cell lookup is a binary search, and only occupied cells cost memory."""
+
+    def __init__(self, points, cell_size=DEFAULT_CELL_SIZE):
+        self.points = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 3)
+        self.cell_size = float(cell_size)
+        count = len(self.points)
+        if count == 0:
+            self.lower = np.zeros(3, dtype=np.int64)
+            self.shape = np.ones(3, dtype=np.int64)
+            self.order = np.empty(0, dtype=np.int64)
+            self.cell_keys = np.empty(0, dtype=np.int64)
+            self.cell_starts = np.empty(0, dtype=np.int64)
+            self.cell_ends = np.empty(0, dtype=np.int64)
+            return
+
+        self.bounds = (self.points.min(axis=0), self.points.max(axis=0))
+        cells = np.floor(self.points / self.cell_size).astype(np.int64)
+        self.lower = cells.min(axis=0)
+        self.shape = cells.max(axis=0) - self.lower + 1
+        keys = np.ravel_multi_index(tuple((cells - self.lower).T), tuple(self.shape))
+        self.order = np.argsort(keys, kind='stable')
+        self.cell_keys, self.cell_starts = np.unique(keys[self.order], return_index=True)
+        self.cell_ends = np.append(self.cell_starts[1:], count)
+
+    def __len__(self):
+        return len(self.points)
+
+    def candidates(self, point, radius):
+        # Point indices in every occupied cell the query sphere overlaps
+        low = np.maximum(np.floor((point - radius) / self.cell_size).astype(np.int64) - self.lower, 0)
+        high = np.minimum(np.floor((point + radius) / self.cell_size).astype(np.int64) - self.lower, self.shape - 1)
+        if np.any(low > high):
+            return np.empty(0, dtype=np.int64)
+        if np.prod(high - low + 1) > len(self.cell_keys):
+            # Sphere covers more cells than are occupied, a plain scan is cheaper
+            return np.arange(len(self.points), dtype=np.int64)
+
+        axes = np.meshgrid(*(np.arange(lo, hi + 1) for lo, hi in zip(low, high)), indexing='ij')
+        keys = np.ravel_multi_index(tuple(axis.ravel() for axis in axes), tuple(self.shape))
+        slots = np.searchsorted(self.cell_keys, keys)
+        inside = slots < len(self.cell_keys)
+        slots = slots[inside]
+        slots = slots[self.cell_keys[slots] == keys[inside]]
+        return self.order[expand_ranges(self.cell_starts[slots], self.cell_ends[slots])]
+
+    def query_radius(self, point, radius):
+        """Indices and distances of the points within radius, nearest first."""
+        point = np.asarray(point, dtype=np.float64)
+        if not len(self.points):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        rows = self.candidates(point, radius)
+        distances = np.linalg.norm(self.points[rows] - point, axis=1)
+        keep = distances <= radius
+        rows, distances = rows[keep], distances[keep]
+        order = np.argsort(distances, kind='stable')
+        return rows[order], distances[order]
+
+    def query_nearest(self, point, k=1, max_distance=np.inf):
+        """Indices and distances of the k nearest points, nearest first."""
+        point = np.asarray(point, dtype=np.float64)
+        if not len(self.points):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        # Past this radius the sphere holds every point
+        reach = np.linalg.norm(np.maximum(np.abs(point - self.bounds[0]), np.abs(point - self.bounds[1])))
+        radius = self.cell_size
+        while True:
+            radius = min(radius, max_distance, reach)
+            rows, distances = self.query_radius(point, radius)
+            if len(rows) >= k or radius >= min(max_distance, reach):
+                return rows[:k], distances[:k]
+            radius *= 2.0
+
+
+class TrackSpatialIndex:
+    """One PointGrid per track, so editing a track only rebuilds its own grid."""
+
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.grids = {}
+        self.flags = {}
+
+    def update(self, key, points, flags=None):
+        self.grids[key] = PointGrid(points, self.cell_size)
+        self.flags[key] = None if flags is None else np.asarray(flags, dtype=np.int64) & 0x7F
+
+    def discard(self, key):
+        self.grids.pop(key, None)
+        self.flags.pop(key, None)
+
+    def clear(self):
+        self.grids.clear()
+        self.flags.clear()
+
+    def query_radius(self, point, radius, exclude=()):
+        """(distance, key, index) for every point within radius, nearest first."""
+        hits = []
+        for key, grid in self.grids.items():
+            if key in exclude:
+                continue
+            rows, distances = grid.query_radius(point, radius)
+            hits.extend(zip(distances.tolist(), itertools.repeat(key), rows.tolist()))
+        hits.sort(key=lambda hit: hit[0])
+        return hits
+
+    def query_nearest(self, point, k=1, max_distance=np.inf, exclude=()):
+        """(distance, key, index) for the k nearest points over all tracks, nearest first."""
+        hits = []
+        for key, grid in self.grids.items():
+            if key in exclude:
+                continue
+            rows, distances = grid.query_nearest(point, k, max_distance)
+            hits.extend(zip(distances.tolist(), itertools.repeat(key), rows.tolist()))
+        hits.sort(key=lambda hit: hit[0])
+        return hits[:k]
+
+    def flagged_points(self, flag_table):
+        """(key, rows, points) for each track's points whose flags are set in flag_table."""
+        for key, grid in self.grids.items():
+            flags = self.flags[key]
+            if flags is None:
+                continue
+            rows = np.flatnonzero(flag_table[flags])
+            if len(rows):
+                yield key, rows, grid.points[rows]
+
@@ -0,0 +1,68 @@
+import numpy as np
+
+try:
+    from .track_core import FLAG_HAS_NAME, compute_probe_hashes, quantize_positions, segment_distances
+except ImportError:
+    import track_core
+    FLAG_HAS_NAME = track_core.FLAG_HAS_NAME
+    compute_probe_hashes = track_core.compute_probe_hashes
+    quantize_positions = track_core.quantize_positions
+    segment_distances = track_core.segment_distances
+
+# Export writes distances with %.4f, anything shorter comes out as 0.0000
+MIN_SEGMENT_LENGTH = 0.00005
+
+# Station, left, right, junction, tunnel and unk each export as their own
+# token, so a point with more than one of them loses all but one
+TOKEN_BITS_MASK = 0x7E
+TOKEN_BIT_COUNT = np.array([bin(flags & TOKEN_BITS_MASK).count("1") for flags in range(128)], dtype=np.int64)
+
+CHECKS = ("duplicate_point", "zero_length_segment", "conflicting_flags", "unmatched_node", "hash_collision")
+
+
+def validate_track(co, radius, node_rows, node_ids):
+    """Check one track's arrays before export. node_rows and node_ids are the
+    track's nodes. Returns (check, row, message) tuples ordered by check; row
+    is the point index the issue is at."""
+    co = np.asarray(co)
+    count = len(co)
+    flags = np.asarray(radius).astype(np.int64) & 0x7F
+    issues = []
+
+    if count > 1:
+        following = np.roll(co, -1, axis=0)
+        duplicate = (co == following).all(axis=1)
+        for row in np.flatnonzero(duplicate).tolist():
+            issues.append(("duplicate_point", row, f"point {row} repeats point {(row + 1) % count}"))
+        short = (segment_distances(co) < MIN_SEGMENT_LENGTH) & ~duplicate
+        for row in np.flatnonzero(short).tolist():
+            issues.append(("zero_length_segment", row, f"segment {row} -> {(row + 1) % count} exports as length 0"))
+
+    for row in np.flatnonzero(TOKEN_BIT_COUNT[flags] > 1).tolist():
+        issues.append(("conflicting_flags", row, f"point {row} has several exclusive flags set ({flags[row]:07b})"))
+
+    node_rows = np.asarray(node_rows, dtype=np.int64)
+    in_range = (node_rows >= 0) & (node_rows < count)
+    named = np.zeros(len(node_rows), dtype=bool)
+    named[in_range] = FLAG_HAS_NAME[flags[node_rows[in_range]]]
+    current_ids = np.zeros(len(node_rows), dtype=np.uint32)
+    current_ids[named] = compute_probe_hashes(quantize_positions(co[node_rows[named]]))
+    for row, node_id, is_in_range, is_named, current_id in zip(node_rows.tolist(), node_ids, in_range.tolist(), named.tolist(), current_ids.tolist()):
+        if not is_in_range:
+            issues.append(("unmatched_node", row, f"node {node_id} points at {row}, past the last point {count - 1}"))
+        elif not is_named:
+            issues.append(("unmatched_node", row, f"node {node_id} points at {row}, which is not a station or junction"))
+        elif str(current_id) != str(node_id):
+            issues.append(("unmatched_node", row, f"node {node_id} no longer matches point {row} (hash {current_id})"))
+
+    named_rows = np.flatnonzero(FLAG_HAS_NAME[flags])
+    hashes = compute_probe_hashes(quantize_positions(co[named_rows]))
+    order = np.argsort(hashes, kind='stable')
+    sorted_hashes = hashes[order]
+    repeated = np.flatnonzero(sorted_hashes[1:] == sorted_hashes[:-1]) + 1
+    for position in repeated.tolist():
+        row = int(named_rows[order[position]])
+        first = int(named_rows[order[np.searchsorted(sorted_hashes, sorted_hashes[position])]])
+        issues.append(("hash_collision", row, f"point {row} hashes to {sorted_hashes[position]} like point {first}"))
+
+    return issues
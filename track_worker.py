@@ -0,0 +1,32 @@
+"""Bootstrap for track_batch's worker processes, run with runpy.run_path.
+
+Workers are plain Python without bpy, so they cannot import the addon
+package normally: its __init__ imports bpy. This registers an empty package
+module over the addon directory instead, so jobs and results pickle under the
+same track_core module name as in Blender, and Blender's own sys.path is
+never touched.
+"""
+import os
+import sys
+import types
+
+ADDON_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def register_package(package):
+    if not package:
+        # track_core was imported as a top-level module
+        if ADDON_DIR not in sys.path:
+            sys.path.append(ADDON_DIR)
+        return
+    parts = package.split(".")
+    for depth in range(1, len(parts) + 1):
+        name = ".".join(parts[:depth])
+        if name not in sys.modules:
+            module = types.ModuleType(name)
+            module.__path__ = [ADDON_DIR] if depth == len(parts) else []
+            sys.modules[name] = module
+
+
+if __name__ == "__track_worker__":
+    register_package(PACKAGE)  # noqa: F821, set through run_path's init_globals
@@ -0,0 +1,146 @@
+import bpy
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from . import track_cache
+from .main import build_track, update_track, has_track_curve, get_cache_dir, show_status
+
+
+# Poll interval backs off while nothing changes and snaps back on activity
+WATCH_MIN_INTERVAL = 0.5
+WATCH_MAX_INTERVAL = 4.0
+WATCH_PENDING_INTERVAL = 0.1
+
+# observed and loaded are keyed by the resolved source path, so pointing a
+# watched track at another file starts from that file's current state
+watch_state = {
+    "interval": WATCH_MIN_INTERVAL,
+    "observed": {},
+    "loaded": {},
+    "pending": None,
+}
+executor = None
+
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def resolve_path(source_path):
+    return os.path.realpath(bpy.path.abspath(source_path))
+
+
+def watched_tracks(path):
+    for scene in bpy.data.scenes:
+        for track in scene.tracks:
+            if track.watch_source and track.source_path and resolve_path(track.source_path) == path:
+                yield scene, track
+
+
+def push_undo(message):
+    # Timers run outside any operator, so nothing else records the reload
+    windows = bpy.context.window_manager.windows
+    if not windows:
+        return
+    try:
+        with bpy.context.temp_override(window=windows[0]):
+            bpy.ops.ed.undo_push(message=message)
+    except RuntimeError:
+        pass
+
+
+def apply_reload(path, signature, future):
+    watch_state["loaded"][path] = signature
+    file_name = os.path.basename(path)
+    try:
+        track_type, arrays, cache_hit = future.result()
+        changed_rows = 0
+        for scene, track in list(watched_tracks(path)):
+            # The track keeps its source path as the user wrote it
+            if has_track_curve(track):
+                changed_rows += update_track(bpy.context, track, track.source_path, track_type, arrays, scene.collection)
+            else:
+                build_track(bpy.context, track, track.source_path, track_type, arrays, collection=scene.collection)
+                changed_rows += arrays.count
+    except Exception as e:
+        show_status(f"TRAIN TOOLS: failed to reload {file_name}: {e}")
+        return
+    push_undo(f"Reload {file_name}")
+    show_status(f"TRAIN TOOLS: reloaded {file_name} ({changed_rows} changed points{', cached' if cache_hit else ''})")
+
+
+def watch_tracks():
+    global executor
+
+    # Parsing runs on a worker thread, only the bpy writes happen in here
+    pending = watch_state["pending"]
+    if pending is not None:
+        path, signature, future = pending
+        if not future.done():
+            return WATCH_PENDING_INTERVAL
+        watch_state["pending"] = None
+        apply_reload(path, signature, future)
+        watch_state["interval"] = WATCH_MIN_INTERVAL
+        return WATCH_MIN_INTERVAL
+
+    observed = watch_state["observed"]
+    loaded = watch_state["loaded"]
+    watched = set()
+    active = False
+    reload = None
+    for scene in bpy.data.scenes:
+        for track in scene.tracks:
+            if not track.watch_source or not track.source_path:
+                continue
+            path = resolve_path(track.source_path)
+            if path in watched:
+                continue
+            watched.add(path)
+            signature = file_signature(path)
+            if signature is None:
+                continue
+            loaded.setdefault(path, signature)
+            previous = observed.get(path)
+            observed[path] = signature
+            if previous != signature:
+                # Still being written, wait until it stops changing
+                active = True
+            elif signature != loaded[path] and reload is None:
+                reload = (path, signature)
+
+    # Forget files no track watches any more
+    for state in (observed, loaded):
+        for path in set(state) - watched:
+            del state[path]
+
+    if reload is not None:
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1)
+        path, signature = reload
+        future = executor.submit(track_cache.read_track_file_cached, get_cache_dir(), path)
+        watch_state["pending"] = (path, signature, future)
+        return WATCH_PENDING_INTERVAL
+
+    if active:
+        watch_state["interval"] = WATCH_MIN_INTERVAL
+    else:
+        watch_state["interval"] = min(watch_state["interval"] * 1.5, WATCH_MAX_INTERVAL)
+    return watch_state["interval"]
+
+
+def register():
+    bpy.app.timers.register(watch_tracks, first_interval=WATCH_MIN_INTERVAL, persistent=True)
+
+
+def unregister():
+    global executor
+    if bpy.app.timers.is_registered(watch_tracks):
+        bpy.app.timers.unregister(watch_tracks)
+    if executor is not None:
+        executor.shutdown(wait=False)
+        executor = None
+    watch_state["pending"] = None